@@ -12,247 +12,373 @@ import digitalio
 import adafruit_character_lcd.character_lcd as characterlcd
 import pwmio
 import time
-from time import sleep
 import os
-import heapq
 import logging
 from logging.handlers import RotatingFileHandler
 from desertbus.normal_view import NormalView
 from desertbus.fetcher_thread import FetcherThread
 from desertbus.shift_data import get_current_shift, SCREEN_COLORS, Shift, make_view_for_shift
-from desertbus.button_handler import ButtonHandler
+from desertbus.button_handler import ButtonHandler, ButtonData
 from desertbus.event_data import make_views_for_events
-from desertbus.config import load_config, get_setting, ConfigKey, ShiftAnim, LcdColor, EventAnim
-from desertbus.base_view import BaseView
+from desertbus.config import load_config, get_setting, get_config_version, ConfigKey, ShiftAnim, LcdColor, EventAnim
+from desertbus.base_view import BaseView, monotonic_millis
+from desertbus.vst_data import VstData
+from desertbus.view_queue import ViewQueue
 import signal
 import sys
 
+# The fetcher thread, once main() gets it going.  The signal handlers need to
+# get at it to tell it to stop.
+_fetcher_thread: FetcherThread | None = None
+
+# How long to wait for the fetcher thread to wrap up on shutdown.  It's a
+# daemon thread, so if it's stuck in the middle of a fetch, we just leave
+# without it.
+_FETCHER_STOP_TIMEOUT_SECS = 1.0
+
+def _stop_fetcher_thread():
+    """Tells the fetcher thread to stop and gives it a moment to do so."""
+    if _fetcher_thread is not None:
+        _fetcher_thread.stop()
+        _fetcher_thread.join(_FETCHER_STOP_TIMEOUT_SECS)
+
 # Everybody do the interrupt!
 def interrupt_handler(signal, frame):
     logger.info('Interrupt caught, shutting down...')
     print('Interrput!  Shutting down...')
+    _stop_fetcher_thread()
     sys.exit(0)
 
 def term_handler(signal, frame):
     logger.info('SIGTERM caught, shutting down...')
     print("SIGTERM'D!!! Shutting down...")
+    _stop_fetcher_thread()
     sys.exit(0)
 
-signal.signal(signal.SIGINT, interrupt_handler)
-signal.signal(signal.SIGTERM, term_handler)
+# How long to wait between frames of the main loop.
+_FRAME_SECS = 0.035
+# How long to wait between passes of the main loop before the first stats come
+# in.  There's nothing to animate and no buttons to check yet, so there's no
+# sense in spinning at full speed.
+_IDLE_SECS = 1.0
+# What goes on the screen while we wait for the first stats to come in.
+_STARTER_MESSAGE = "Your driver is:".center(16) + "\n" + "JOCKO".center(16)
+
+# The LcdColor config values that pick a specific shift's color, mapped to
+# their Shift.  LcdColor.CURRENT_SHIFT isn't in here; that's not a shift, it's
+# "go look at the clock".
+_CONFIG_SHIFT_TO_SHIFT = {
+    LcdColor.DAWN_GUARD: Shift.DAWN_GUARD,
+    LcdColor.ALPHA_FLIGHT: Shift.ALPHA_FLIGHT,
+    LcdColor.NIGHT_WATCH: Shift.NIGHT_WATCH,
+    LcdColor.ZETA_SHIFT: Shift.ZETA_SHIFT,
+    LcdColor.OMEGA_SHIFT: Shift.OMEGA_SHIFT,
+}
 
 def config_shift_to_data_shift(config_shift: LcdColor) -> Shift:
     """Converts the LcdColor config key to a Shift object.  I couldn't decide
     if I wanted this in shift_data.py or config.py, so it lives here for now."""
-    match config_shift:
-        case LcdColor.DAWN_GUARD:
-            return Shift.DAWN_GUARD
-        case LcdColor.ALPHA_FLIGHT:
-            return Shift.ALPHA_FLIGHT
-        case LcdColor.NIGHT_WATCH:
-            return Shift.NIGHT_WATCH
-        case LcdColor.ZETA_SHIFT:
-            return Shift.ZETA_SHIFT
-        case LcdColor.OMEGA_SHIFT:
-            return Shift.OMEGA_SHIFT
-        case _:
-            # Whoops, you should have handled this before you called this.
-            raise ValueError(f'Invalid config-to-shift value {config_shift}')
-
-# Get a logger going.
-log_file = f"{os.path.expanduser('~')}/dbpibus.log"
-log_format = logging.Formatter('%(asctime)s %(levelname)s [%(threadName)s] [%(module)s] %(funcName)s(%(lineno)d): %(message)s')
-
-handler = RotatingFileHandler(log_file, mode='a', maxBytes=5*1024*1024, backupCount=10, encoding=None, delay=0)
-handler.setFormatter(log_format)
-handler.setLevel(logging.INFO)
+    try:
+        return _CONFIG_SHIFT_TO_SHIFT[config_shift]
+    except KeyError:
+        # Whoops, you should have handled this before you called this.
+        raise ValueError(f'Invalid config-to-shift value {config_shift}')
+
+def resolve_shift(stats: VstData, current_shift: Shift, now_secs: float=None) -> Shift:
+    """Works out what shift it is right now, given the latest stats (which may
+    be None), whatever shift we currently think it is, and the current
+    wall-clock time in seconds (see get_current_shift()).
+
+    Note that if the Omega flag is None, *don't change out of Omega*.  None
+    means there was some problem fetching the Omega state, not that Omega is
+    over (likely meaning we're in the offseason).  The ONLY way we leave Omega
+    is if the flag is EXPLICITLY False.  If we were in Omega and got a None,
+    stay in Omega."""
+    if (stats is not None
+        and (stats.is_omega_shift
+            or (stats.is_omega_shift is None and current_shift == Shift.OMEGA_SHIFT))):
+        return Shift.OMEGA_SHIFT
+    return get_current_shift(now_secs)
+
+# How close the log gets to its max size before LazyRotatingFileHandler starts
+# checking the actual file for real.
+_LOG_ROLLOVER_SLACK_BYTES = 64 * 1024
+
+class LazyRotatingFileHandler(RotatingFileHandler):
+    """A RotatingFileHandler that doesn't go poking at the log file on disk for
+    every single record.  The stock one stats the file and seeks to the end of
+    it on each record just to see if it's time to roll over, which is a lot of
+    syscalls for a log that grows a line at a time.  This keeps a rough count
+    of how much room is left instead, and only does the real check once that
+    gets low.
+
+    The count is in characters, not bytes, so it's not exact, but that's what
+    the slack is for."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # How much more we can write before we need to look at the file again.
+        self._unchecked_room = 0
+
+    def shouldRollover(self, record):
+        if self._unchecked_room > 0:
+            return False
+
+        if super().shouldRollover(record):
+            return True
+
+        # The stock check just seeked to the end of the file, so we know
+        # exactly where we are.  Work out how long we can coast from here.
+        if self.stream is not None and self.maxBytes > 0:
+            self._unchecked_room = self.maxBytes - self.stream.tell() - _LOG_ROLLOVER_SLACK_BYTES
+        return False
+
+    def format(self, record):
+        msg = super().format(record)
+        # Every record that gets written gets formatted first, so this is as
+        # good a place as any to keep count.  Plus one for the newline.
+        self._unchecked_room -= len(msg) + 1
+        return msg
+
+    def doRollover(self):
+        super().doRollover()
+        # New file, so check it properly next time.
+        self._unchecked_room = 0
 
 logger = logging.getLogger('root')
-logger.setLevel(logging.INFO)
-logger.addHandler(handler)
-
-# Say hello to the nice people, dbpibus.
-logger.info("Welcome to CaptainSpam's Desert Bus for Hope Home Verisimulator Project.")
-
-# Set up the LCD.
-logger.info("Initializing everything for a 2x16 LCD...")
-lcd_columns = 16
-lcd_rows = 2
-
-lcd_rs = digitalio.DigitalInOut(board.D22)
-lcd_en = digitalio.DigitalInOut(board.D17)
-lcd_d4 = digitalio.DigitalInOut(board.D25)
-lcd_d5 = digitalio.DigitalInOut(board.D24)
-lcd_d6 = digitalio.DigitalInOut(board.D23)
-lcd_d7 = digitalio.DigitalInOut(board.D27)
-
-# RGB pins!
-red = pwmio.PWMOut(board.D21)
-green = pwmio.PWMOut(board.D12)
-blue = pwmio.PWMOut(board.D18)
-
-# Our precious LCD object.  Take good care of it.
-lcd = characterlcd.Character_LCD_RGB(lcd_rs, lcd_en, lcd_d4, lcd_d5, lcd_d6,
-                                      lcd_d7, lcd_columns, lcd_rows, red, green, blue)
-
-# Clear the LCD and start it off with the current shift color, solely by the
-# clock.  If we need Omega, we'll get that on the first data fetch.
-lcd.clear()
-current_shift = get_current_shift()
-logger.info(f'Starting off with {current_shift}...')
-lcd.color = SCREEN_COLORS[current_shift]
-
-# And a starter message until the data comes in.
-lcd.message = "Your driver is:".center(16) + "\n" + "JOCKO".center(16)
-
-# Ready the buttons!
-button_handler = ButtonHandler()
-previous_buttons = None
-
-# Our view queue.  Or, well, heap.  I know it looks like a list now, but trust
-# me, it'll be a queue.  Heap.  Heapy queue.
-views = []
-
-# Init config now, while we're at it.
-load_config()
-
-# Kick the thread into action.
-t = FetcherThread('FetcherThread')
-t.start()
-
-logger.info('Ready.  Your driver is: JOCKO')
-# At least say something on the console so we know we're live.
-print('Your driver is: JOCKO')
-
-is_aware_of_dead_fetcher_thread = False
-has_done_initial_omega_check = False
-previous_stats = None
-last_known_lcd_setting = None
-
-# And now, presenting the entire main loop.  With a handy try-except block!
-try:
-    while True:
-        latest_stats = t.latest_stats
-        current_lcd_setting = get_setting(ConfigKey.LCD_COLOR)
-
-        # If the LCD color setting has suddenly changed, we need to update right
-        # away on this frame.
-        if not current_lcd_setting == last_known_lcd_setting:
-            if current_lcd_setting == LcdColor.CURRENT_SHIFT:
-                # If it's the current shift, work out what it is.
-                if latest_stats is not None and latest_stats.is_omega_shift:
-                    lcd.color = SCREEN_COLORS[Shift.OMEGA_SHIFT]
+
+def setup_logging():
+    """Gets the logger going, writing out to ~/dbpibus.log."""
+    log_file = f"{os.path.expanduser('~')}/dbpibus.log"
+    log_format = logging.Formatter('%(asctime)s %(levelname)s [%(threadName)s] [%(module)s] %(funcName)s(%(lineno)d): %(message)s')
+
+    handler = LazyRotatingFileHandler(log_file, mode='a', maxBytes=5*1024*1024, backupCount=10, encoding=None, delay=0)
+    handler.setFormatter(log_format)
+    handler.setLevel(logging.INFO)
+
+    logger.setLevel(logging.INFO)
+    logger.addHandler(handler)
+
+def main():
+    global _fetcher_thread
+
+    setup_logging()
+    signal.signal(signal.SIGINT, interrupt_handler)
+    signal.signal(signal.SIGTERM, term_handler)
+
+    # Say hello to the nice people, dbpibus.
+    logger.info("Welcome to CaptainSpam's Desert Bus for Hope Home Verisimulator Project.")
+
+    # Set up the LCD.
+    logger.info("Initializing everything for a 2x16 LCD...")
+    lcd_columns = 16
+    lcd_rows = 2
+
+    lcd_rs = digitalio.DigitalInOut(board.D22)
+    lcd_en = digitalio.DigitalInOut(board.D17)
+    lcd_d4 = digitalio.DigitalInOut(board.D25)
+    lcd_d5 = digitalio.DigitalInOut(board.D24)
+    lcd_d6 = digitalio.DigitalInOut(board.D23)
+    lcd_d7 = digitalio.DigitalInOut(board.D27)
+
+    # RGB pins!
+    red = pwmio.PWMOut(board.D21)
+    green = pwmio.PWMOut(board.D12)
+    blue = pwmio.PWMOut(board.D18)
+
+    # Our precious LCD object.  Take good care of it.
+    lcd = characterlcd.Character_LCD_RGB(lcd_rs, lcd_en, lcd_d4, lcd_d5, lcd_d6,
+                                          lcd_d7, lcd_columns, lcd_rows, red, green, blue)
+
+    # The last color we wrote to the LCD backlight.  Every color change means three
+    # PWM writes, so there's no sense doing it if nothing's actually changed.
+    last_lcd_color = None
+
+    def set_lcd_color(color):
+        """Sets the LCD backlight color, unless it's already that color."""
+        nonlocal last_lcd_color
+        if not color == last_lcd_color:
+            lcd.color = color
+            last_lcd_color = color
+
+    # Clear the LCD and start it off with the current shift color, solely by the
+    # clock.  If we need Omega, we'll get that on the first data fetch.
+    lcd.clear()
+    current_shift: Shift = get_current_shift()
+    logger.info(f'Starting off with {current_shift}...')
+    set_lcd_color(SCREEN_COLORS[current_shift])
+
+    # And a starter message until the data comes in.
+    lcd.message = _STARTER_MESSAGE
+
+    # Ready the buttons!
+    button_handler = ButtonHandler()
+    previous_buttons: ButtonData | None = None
+
+    # Our view queue.  It was a heap for a while, but there's never enough in here
+    # to make that worth it.
+    views: ViewQueue = ViewQueue()
+
+    # Init config now, while we're at it.
+    load_config()
+
+    # Kick the thread into action.
+    t = FetcherThread('FetcherThread')
+    _fetcher_thread = t
+    t.start()
+
+    logger.info('Ready.  Your driver is: JOCKO')
+    # At least say something on the console so we know we're live.
+    print('Your driver is: JOCKO')
+
+    is_aware_of_dead_fetcher_thread: bool = False
+    has_done_initial_omega_check: bool = False
+    previous_stats: VstData | None = None
+    last_known_lcd_setting: LcdColor | None = None
+    last_known_config_version: int | None = None
+
+    # These get called every single frame, so grab them once here rather than
+    # making a fresh bound method for each call.
+    get_button_state = button_handler.get_button_state
+    wait_for_stats = t.wait_for_stats
+
+    # And now, presenting the entire main loop.  With a handy try-except block!
+    try:
+        while True:
+            latest_stats: VstData | None = t.latest_stats
+            # Everything that happens this frame happens at the same time.  The
+            # views all use this timestamp rather than each checking the clock.
+            # The wall-clock time is just for working out the shift; anything
+            # timing frames wants the monotonic one.
+            now_millis: int = monotonic_millis()
+            now_secs: float = time.time()
+
+            # Only go back to the config for settings if something's changed.
+            # Otherwise, the ones from last frame are still good.
+            config_version = get_config_version()
+            if not config_version == last_known_config_version:
+                current_lcd_setting: LcdColor = get_setting(ConfigKey.LCD_COLOR)
+                shift_anim_setting: ShiftAnim = get_setting(ConfigKey.SHOW_SHIFT_ANIM)
+                event_anim_setting: EventAnim = get_setting(ConfigKey.SHOW_EVENT_ANIM)
+                last_known_config_version = config_version
+
+            # Work out what shift we're in right now.  This feeds both the LCD
+            # color and the shift transition check below.
+            now_shift: Shift = resolve_shift(latest_stats, current_shift, now_secs)
+
+            # If the LCD color setting has suddenly changed, we need to update right
+            # away on this frame.
+            if not current_lcd_setting == last_known_lcd_setting:
+                if current_lcd_setting == LcdColor.CURRENT_SHIFT:
+                    # If it's the current shift, use what we just worked out.
+                    set_lcd_color(SCREEN_COLORS[now_shift])
                 else:
-                    lcd.color = SCREEN_COLORS[get_current_shift()]
-            else:
-                # If the setting is just a single shift, set it now.
-                lcd.color = SCREEN_COLORS[config_shift_to_data_shift(current_lcd_setting)]
-
-        # Check if we're in Omega yet.  Y'know, if there's stats at all.  Note
-        # that if the Omega flag is None, *don't change out of Omega*.  None
-        # means there was some problem fetching the Omega state, not that Omega
-        # is over (likely meaning we're in the offseason).  The ONLY way we
-        # leave Omega is if the flag is EXPLICITLY False.  If we were in Omega
-        # and got a None, stay in Omega.
-        now_shift = None
-        if (latest_stats is not None
-            and (latest_stats.is_omega_shift
-                or (latest_stats.is_omega_shift is None and now_shift == Shift.OMEGA_SHIFT))):
-            now_shift = Shift.OMEGA_SHIFT
-        else:
-            now_shift = get_current_shift()
-        if not now_shift == current_shift:
-            logger.info(f'Shift change!  Changing from {current_shift} to {now_shift}...')
-
-            # Set the screen color first (unless there's an override in config).
-            if current_lcd_setting == LcdColor.CURRENT_SHIFT:
-                lcd.color = SCREEN_COLORS[now_shift]
-
-            # Just to clarify the logic here, we're pushing a new anim on a
-            # shift change (since now_shift is not the same as current_shift),
-            # but ONLY if:
-            #
-            # 1. We have stats (so we don't transition directly from YDIJ to a
-            #    shift transition in the event that the network takes time to
-            #    connect and the first time sync post-connection pushes us to
-            #    another shift), -and-
-            # 2. The current shift anim setting is ALWAYS, -or-
-            # 3. The current shift anim setting is ONLY_IN_SEASON -and- we know,
-            #    from the stats, that we are in run (that is, that we are
-            #    fulfilling the ONLY_IN_SEASON requirement), -and-
-            # 4. The currently-displayed shift isn't Omega (Omega should
-            #    override the current "actual" shift), -and-
-            # 5. The shift we're about to display (now_shift) is Omega -and-
-            #    we've done the initial Omega check (Omega is a special case;
-            #    since we initialize with the current "actual" shift BEFORE we
-            #    do a data fetch, we'll never start in Omega, meaning if the
-            #    script is started while Omega is live, we would always display
-            #    the Omega anim on startup if we didn't wait for an initial
-            #    check).
-            shift_anim_setting = get_setting(ConfigKey.SHOW_SHIFT_ANIM)
-            if (latest_stats is not None
-                and (shift_anim_setting == ShiftAnim.ALWAYS
-                    or (shift_anim_setting == ShiftAnim.ONLY_IN_SEASON
-                        and latest_stats.is_live))
-                    and not current_shift == Shift.OMEGA_SHIFT
-                    and not (now_shift == Shift.OMEGA_SHIFT
-                        and not has_done_initial_omega_check)):
-                heapq.heappush(views, make_view_for_shift(lcd, now_shift))
-
-            current_shift = now_shift
-        if latest_stats is not None:
-            if len(views) == 0:
-                # If this is the first pass or if NormalView somehow got removed
-                # from the queue, put a new NormalView in.
-                heapq.heappush(views, NormalView(lcd))
-
-            # Handle any buttons first.
-            buttons = button_handler.get_button_state()
-            if not buttons == previous_buttons:
-                # Well, only handle them if they're different than before.
-                # There's no reason (yet) to hold a button down, so we only act
-                # on presses.
-                button_result = views[0].handle_buttons(latest_stats, buttons)
-
-                if isinstance(button_result, BaseView):
-                    # If we got a view back, add it to the heap!
-                    heapq.heappush(views, button_result)
-
-            previous_buttons = buttons
-
-            # Check for events (if the run is live); add those in if need be.
-            if latest_stats.is_live and get_setting(ConfigKey.SHOW_EVENT_ANIM) == EventAnim.ALWAYS:
-                event_views = make_views_for_events(lcd, previous_stats, latest_stats)
-                if len(event_views) > 0:
-                    for event_view in event_views:
-                        logger.info(f'Event occurred!  Adding {event_view} to the queue...')
-                        heapq.heappush(views, event_view)
-
-            # Then, handle the next frame.
-            if views[0].next_frame(latest_stats):
-                # This view just finished up, so pop it away.
-                logger.info(f'View {views[0].name} complete, removing from queue...')
-                heapq.heappop(views)
-
-            # Stash away the previous stats and settings for the next check.
-            previous_stats = latest_stats
-            last_known_lcd_setting = current_lcd_setting
-
-        if not t.is_alive() and not is_aware_of_dead_fetcher_thread:
-            logger.critical("THE FETCHER THREAD ISN'T RUNNING!  THIS IS REALLY BAD!")
-            # TODO: Maybe restart the thread?  This really, REALLY shouldn't
-            # happen, so there's a chance we're in a super bad state somehow.
-            is_aware_of_dead_fetcher_thread = True
-
-        # After all that, if we have stats, make sure the initial omega check
-        # flag is true.
-        if latest_stats is not None and latest_stats.is_omega_shift is not None:
-            has_done_initial_omega_check = True
-
-        sleep(0.035)
-except Exception as e:
-    # Welp, we're hosed.
-    logger.exception('EXCEPTION!!!')
-    logger.critical('Shutting down...')
-    print('EXCEPTION!!! Shutting down...')
-    raise e
+                    # If the setting is just a single shift, set it now.
+                    set_lcd_color(SCREEN_COLORS[config_shift_to_data_shift(current_lcd_setting)])
+
+            if not now_shift == current_shift:
+                logger.info(f'Shift change!  Changing from {current_shift} to {now_shift}...')
+
+                # Set the screen color first (unless there's an override in config).
+                if current_lcd_setting == LcdColor.CURRENT_SHIFT:
+                    set_lcd_color(SCREEN_COLORS[now_shift])
+
+                # Just to clarify the logic here, we're pushing a new anim on a
+                # shift change (since now_shift is not the same as current_shift),
+                # but ONLY if:
+                #
+                # 1. We have stats (so we don't transition directly from YDIJ to a
+                #    shift transition in the event that the network takes time to
+                #    connect and the first time sync post-connection pushes us to
+                #    another shift), -and-
+                # 2. The current shift anim setting is ALWAYS, -or-
+                # 3. The current shift anim setting is ONLY_IN_SEASON -and- we know,
+                #    from the stats, that we are in run (that is, that we are
+                #    fulfilling the ONLY_IN_SEASON requirement), -and-
+                # 4. The currently-displayed shift isn't Omega (Omega should
+                #    override the current "actual" shift), -and-
+                # 5. The shift we're about to display (now_shift) is Omega -and-
+                #    we've done the initial Omega check (Omega is a special case;
+                #    since we initialize with the current "actual" shift BEFORE we
+                #    do a data fetch, we'll never start in Omega, meaning if the
+                #    script is started while Omega is live, we would always display
+                #    the Omega anim on startup if we didn't wait for an initial
+                #    check).
+                if (latest_stats is not None
+                    and (shift_anim_setting == ShiftAnim.ALWAYS
+                        or (shift_anim_setting == ShiftAnim.ONLY_IN_SEASON
+                            and latest_stats.is_live))
+                        and not current_shift == Shift.OMEGA_SHIFT
+                        and not (now_shift == Shift.OMEGA_SHIFT
+                            and not has_done_initial_omega_check)):
+                    views.push(make_view_for_shift(lcd, now_shift))
+
+                current_shift = now_shift
+            if latest_stats is not None:
+                if len(views) == 0:
+                    # If this is the first pass or if NormalView somehow got removed
+                    # from the queue, put a new NormalView in.
+                    views.push(NormalView(lcd))
+
+                # Handle any buttons first.
+                buttons = get_button_state()
+                if not buttons == previous_buttons:
+                    # Well, only handle them if they're different than before.
+                    # There's no reason (yet) to hold a button down, so we only act
+                    # on presses.
+                    button_result = views.top.handle_buttons(latest_stats, buttons)
+
+                    if isinstance(button_result, BaseView):
+                        # If we got a view back, add it to the queue!
+                        views.push(button_result)
+
+                previous_buttons = buttons
+
+                # Check for events (if the run is live); add those in if need be.
+                # New stats only come in every 30 seconds or so, so on most
+                # frames we've still got the exact same object as last time,
+                # and there's nothing to compare.
+                if (latest_stats is not previous_stats
+                    and latest_stats.is_live
+                    and event_anim_setting == EventAnim.ALWAYS):
+                    event_views = make_views_for_events(lcd, previous_stats, latest_stats)
+                    if len(event_views) > 0:
+                        for event_view in event_views:
+                            logger.info(f'Event occurred!  Adding {event_view} to the queue...')
+                        views.push_all(event_views)
+
+                # Then, handle the next frame.  Grab whatever's on top now, after any
+                # buttons or events above got their say.
+                top_view = views.top
+                if top_view.next_frame(latest_stats, now_millis):
+                    # This view just finished up, so pop it away.
+                    logger.info(f'View {top_view.name} complete, removing from queue...')
+                    views.pop()
+
+                # Stash away the previous stats and settings for the next check.
+                previous_stats = latest_stats
+                last_known_lcd_setting = current_lcd_setting
+
+            if not t.is_alive() and not is_aware_of_dead_fetcher_thread:
+                logger.critical("THE FETCHER THREAD ISN'T RUNNING!  THIS IS REALLY BAD!")
+                # TODO: Maybe restart the thread?  This really, REALLY shouldn't
+                # happen, so there's a chance we're in a super bad state somehow.
+                is_aware_of_dead_fetcher_thread = True
+
+            # After all that, if we have stats, make sure the initial omega check
+            # flag is true.
+            if latest_stats is not None and latest_stats.is_omega_shift is not None:
+                has_done_initial_omega_check = True
+
+            # Wait for the next frame.  If the fetcher thread comes back with new
+            # stats in the meantime, we'll wake up early and deal with them right
+            # away rather than on the next poll.
+            wait_for_stats(_FRAME_SECS if latest_stats is not None else _IDLE_SECS)
+    except Exception as e:
+        # Welp, we're hosed.
+        logger.exception('EXCEPTION!!!')
+        logger.critical('Shutting down...')
+        print('EXCEPTION!!! Shutting down...')
+        raise e
+
+if __name__ == '__main__':
+    main()
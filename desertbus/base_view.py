@@ -5,6 +5,56 @@ import time
 import adafruit_character_lcd.character_lcd as characterlcd
 from desertbus.button_handler import ButtonData
 
+def monotonic_millis() -> int:
+    """Gets the current monotonic time, in millis.  This is what views should
+    use for timing frames and such, as opposed to wall-clock time; it won't
+    jump around if NTP decides to fix the clock mid-animation."""
+    return time.monotonic_ns() // 1_000_000
+
+# The last message written to each LCD, so we don't bother re-sending the same
+# thing over the (slow, bit-banged) bus every frame.  This is tracked per LCD,
+# NOT per view, since whatever view is on top owns the screen; if one view
+# interrupts another, the one underneath needs to redraw when it comes back.
+_last_messages = {}
+
+def _write_changes(lcd: characterlcd.Character_LCD, old_message: str, new_message: str):
+    """Writes new_message to the LCD, assuming old_message is what's on it now.
+    Every byte to the LCD costs us, and usually only a few characters change
+    between frames (the last couple digits of the donation total, say), so for
+    each line, this just moves the cursor to the first character that changed
+    and writes through the last one that did.  If the lines don't match up one
+    to one (different number of lines, or different lengths), this gives up and
+    writes the whole thing."""
+    old_lines = old_message.split("\n")
+    new_lines = new_message.split("\n")
+    if not len(old_lines) == len(new_lines):
+        lcd.message = new_message
+        return
+    for (old_line, new_line) in zip(old_lines, new_lines):
+        if not len(old_line) == len(new_line):
+            lcd.message = new_message
+            return
+
+    for (row, (old_line, new_line)) in enumerate(zip(old_lines, new_lines)):
+        if old_line == new_line:
+            continue
+
+        start = 0
+        while old_line[start] == new_line[start]:
+            start += 1
+        end = len(new_line)
+        while old_line[end - 1] == new_line[end - 1]:
+            end -= 1
+
+        # The message setter moves the LCD's cursor to wherever column and row
+        # say before it writes, so just set those; cursor_position() would send
+        # a set-address command of its own on top of that.  The library sets
+        # them back to 0 (in software only) after every write, so this has to
+        # be done each time.
+        lcd.column = start
+        lcd.row = row
+        lcd.message = new_line[start:end]
+
 class BaseView(ABC):
     """The basic abstract view from which other views derive."""
     def __init__(self, lcd: characterlcd.Character_LCD):
@@ -23,14 +73,31 @@ class BaseView(ABC):
         """The name of the view, suitable for the logger."""
         return self.__class__.__name__
 
-    def _advance_frame_time(self):
+    def _advance_frame_time(self, now_millis: int=None):
         """Advances the frame.  Which just means update the most recent frame
-        timestamp."""
-        self._last_frame_millis = round(time.time() * 1000)
+        timestamp (in monotonic millis).  If now_millis isn't given, the current
+        time is used."""
+        self._last_frame_millis = now_millis if now_millis is not None else monotonic_millis()
 
     def _display_text(self, line1, line2):
         """Convenience method for displaying text to the screen."""
-        self._lcd.message = line1 + "\n" + line2
+        self._display_message(line1 + "\n" + line2)
+
+    def _display_message(self, message: str):
+        """Displays an already-joined message (both lines, with a newline
+        between them) to the screen.  If that's exactly what's already on the
+        screen, this doesn't bother writing it again, and if it's only partly
+        different, only the part that changed gets written."""
+        lcd = self._lcd
+        last_message = _last_messages.get(lcd)
+        if last_message == message:
+            return
+
+        if last_message is None:
+            lcd.message = message
+        else:
+            _write_changes(lcd, last_message, message)
+        _last_messages[lcd] = message
 
     def __lt__(self, other):
         if not isinstance(other, BaseView):
@@ -44,11 +111,21 @@ class BaseView(ABC):
         return None
 
     @abstractmethod
-    def next_frame(self, data: any) -> bool:
+    def next_frame(self, data: any, now_millis: int=None) -> bool:
         """Process the next frame.  Exactly what this means is up to the
         implementation; it might just be repeating the same strings currently
         on-screen.
 
+        data is whatever the fetcher thread fetched most recently.  The main
+        loop only calls this once there's something there, so it's a VstData;
+        views shouldn't need to check that every frame.  NormalView still
+        bails out on None, just in case.
+
+        now_millis is the timestamp of this frame, from monotonic_millis().  The
+        main loop takes it once per frame so everything in that frame works
+        from the same clock.  If it's None, the view should just get the time
+        itself.
+
         There is no guarantee that a given view will handle the next frame that
         needs processing, even if the view isn't finished yet.  Any view can be
         interrupted by something of a higher (lower-numbered) priority, in which
@@ -2,23 +2,27 @@
 
 import time
 import os
-import board
-import digitalio
-from dataclasses import dataclass
+from typing import NamedTuple
 import logging
 
 logger = logging.getLogger(__name__)
 
-_BACK_PIN = board.D26
-_MINUS_PIN = board.D6
-_PLUS_PIN = board.D5
-_SELECT_PIN = board.D16
+# These are names of pins in the board module, not the pins themselves.  Just
+# about everything imports this file for ButtonData, and importing board means
+# Blinka goes and probes the hardware, so we put that off until someone
+# actually makes a ButtonHandler.
+_BACK_PIN = 'D26'
+_MINUS_PIN = 'D6'
+_PLUS_PIN = 'D5'
+_SELECT_PIN = 'D16'
 
-@dataclass(frozen=True)
-class ButtonData:
+class ButtonData(NamedTuple):
     """The state of the buttons at an instant in time.  Note that the buttons
     (and, for that matter, the menu system they control) are based heavily on
-    four-button pinball table service panels common since the 90s or so."""
+    four-button pinball table service panels common since the 90s or so.
+
+    This gets made fresh on every frame, so it's a NamedTuple rather than a
+    dataclass; that's cheaper to build and to compare against last frame's."""
 
     # Back/Service Credit button (the leftmost button).  Service Credit,
     # obviously, isn't particularly useful in this case, but I want it there for
@@ -45,28 +49,36 @@ class ButtonHandler:
     _select_button = None
 
     def __init__(self):
+        import board
+        import digitalio
+
         logger.info('Initializing ButtonHandler!')
         logger.debug(f'Pins: back={_BACK_PIN}; minus={_MINUS_PIN}; plus={_PLUS_PIN}; select={_SELECT_PIN}')
 
         # Buttons up!
-        self._back_button = digitalio.DigitalInOut(_BACK_PIN)
+        self._back_button = digitalio.DigitalInOut(getattr(board, _BACK_PIN))
         self._back_button.direction = digitalio.Direction.INPUT
         self._back_button.pull = digitalio.Pull.UP
 
-        self._minus_button = digitalio.DigitalInOut(_MINUS_PIN)
+        self._minus_button = digitalio.DigitalInOut(getattr(board, _MINUS_PIN))
         self._minus_button.direction = digitalio.Direction.INPUT
         self._minus_button.pull = digitalio.Pull.UP
 
-        self._plus_button = digitalio.DigitalInOut(_PLUS_PIN)
+        self._plus_button = digitalio.DigitalInOut(getattr(board, _PLUS_PIN))
         self._plus_button.direction = digitalio.Direction.INPUT
         self._plus_button.pull = digitalio.Pull.UP
 
-        self._select_button = digitalio.DigitalInOut(_SELECT_PIN)
+        self._select_button = digitalio.DigitalInOut(getattr(board, _SELECT_PIN))
         self._select_button.direction = digitalio.Direction.INPUT
         self._select_button.pull = digitalio.Pull.UP
 
+        # All four, in ButtonData order.  get_button_state() runs every frame,
+        # so it just unpacks this rather than going back to self four times.
+        self._pins = (self._back_button, self._minus_button, self._plus_button, self._select_button)
+
     def get_button_state(self):
-        return ButtonData(back = not self._back_button.value,
-                          minus = not self._minus_button.value,
-                          plus = not self._plus_button.value,
-                          select = not self._select_button.value)
+        back, minus, plus, select = self._pins
+        return ButtonData(back = not back.value,
+                          minus = not minus.value,
+                          plus = not plus.value,
+                          select = not select.value)
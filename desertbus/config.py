@@ -99,41 +99,33 @@ def _make_default_config():
         ConfigKey.POINTS_CRASHES: PointsCrashes.SEPARATE,
     }
 
+# Which enum each config key's values come from.  This is what validation goes
+# by, so every key in ConfigKey needs to be in here.
+_KEY_TO_ENUM = {
+    ConfigKey.SHOW_SHIFT_ANIM: ShiftAnim,
+    ConfigKey.SHOW_EVENT_ANIM: EventAnim,
+    ConfigKey.LCD_COLOR: LcdColor,
+    ConfigKey.SHOW_TIME_IN_RUN: ShowTime,
+    ConfigKey.SHOW_TIME_IN_PRESEASON: ShowTime,
+    ConfigKey.SHOW_TIME_IN_OFFSEASON: ShowTime,
+    ConfigKey.TIME_FORMAT: TimeFormat,
+    ConfigKey.DATE_FORMAT: DateFormat,
+    ConfigKey.POINTS_CRASHES: PointsCrashes,
+}
+
 _current_config = None
 
-def _validate(key: ConfigKey, value: any) -> bool:
-    """Validates that the given value is valid for the given key.  Returns True
-    if valid, False if not."""
-    try:
-        _validate_or_raise(key, value)
-        return True
-    except:
-        return False
+# Bumped every time the config changes, whether by loading or by setting
+# something.  See get_config_version().
+_config_version = 0
 
 def _validate_or_raise(key: ConfigKey, value: any):
     """Validates that the given value is valid for the given key.  Raises an
     exception if validation fails."""
-    match key:
-        case ConfigKey.SHOW_SHIFT_ANIM:
-            ShiftAnim(value)
-        case ConfigKey.SHOW_EVENT_ANIM:
-            EventAnim(value)
-        case ConfigKey.LCD_COLOR:
-            LcdColor(value)
-        case ConfigKey.SHOW_TIME_IN_RUN:
-            ShowTime(value)
-        case ConfigKey.SHOW_TIME_IN_PRESEASON:
-            ShowTime(value)
-        case ConfigKey.SHOW_TIME_IN_OFFSEASON:
-            ShowTime(value)
-        case ConfigKey.TIME_FORMAT:
-            TimeFormat(value)
-        case ConfigKey.DATE_FORMAT:
-            DateFormat(value)
-        case ConfigKey.POINTS_CRASHES:
-            PointsCrashes(value)
-        case _:
-            raise ValueError(f'Invalid key {key}')
+    enum_class = _KEY_TO_ENUM.get(key)
+    if enum_class is None:
+        raise ValueError(f'Invalid key {key}')
+    enum_class(value)
 
 def load_config():
     """Loads config from disk.  Raises an exception if what's on disk isn't
@@ -153,6 +145,7 @@ def load_config():
     thingamajig, after all."""
     global _current_config
     global _CONFIG_FILE
+    global _config_version
     
     try:
         with open(_CONFIG_FILE) as json_file:
@@ -165,40 +158,19 @@ def load_config():
             # Now, validate what we've got.  Check each of the enum values to
             # see if they raise exceptions, and pull them back to their defaults
             # if they do.
-            # TODO: If we wind up with more settings, we probably want to do
-            # this less bluntly.
-            if not _validate(ConfigKey.SHOW_SHIFT_ANIM, new_config[ConfigKey.SHOW_SHIFT_ANIM]):
-                new_config[ConfigKey.SHOW_SHIFT_ANIM] = pristine_defaults[ConfigKey.SHOW_SHIFT_ANIM]
-
-            if not _validate(ConfigKey.SHOW_EVENT_ANIM, new_config[ConfigKey.SHOW_EVENT_ANIM]):
-                new_config[ConfigKey.SHOW_EVENT_ANIM] = pristine_defaults[ConfigKey.SHOW_EVENT_ANIM]
-
-            if not _validate(ConfigKey.LCD_COLOR, new_config[ConfigKey.LCD_COLOR]):
-                new_config[ConfigKey.LCD_COLOR] = pristine_defaults[ConfigKey.LCD_COLOR]
-
-            if not _validate(ConfigKey.SHOW_TIME_IN_RUN, new_config[ConfigKey.SHOW_TIME_IN_RUN]):
-                new_config[ConfigKey.SHOW_TIME_IN_RUN] = pristine_defaults[ConfigKey.SHOW_TIME_IN_RUN]
-
-            if not _validate(ConfigKey.SHOW_TIME_IN_PRESEASON, new_config[ConfigKey.SHOW_TIME_IN_PRESEASON]):
-                new_config[ConfigKey.SHOW_TIME_IN_PRESEASON] = pristine_defaults[ConfigKey.SHOW_TIME_IN_PRESEASON]
-
-            if not _validate(ConfigKey.SHOW_TIME_IN_OFFSEASON, new_config[ConfigKey.SHOW_TIME_IN_OFFSEASON]):
-                new_config[ConfigKey.SHOW_TIME_IN_OFFSEASON] = pristine_defaults[ConfigKey.SHOW_TIME_IN_OFFSEASON]
-
-            if not _validate(ConfigKey.TIME_FORMAT, new_config[ConfigKey.TIME_FORMAT]):
-                new_config[ConfigKey.TIME_FORMAT] = pristine_defaults[ConfigKey.TIME_FORMAT]
-
-            if not _validate(ConfigKey.DATE_FORMAT, new_config[ConfigKey.DATE_FORMAT]):
-                new_config[ConfigKey.DATE_FORMAT] = pristine_defaults[ConfigKey.DATE_FORMAT]
-
-            if not _validate(ConfigKey.POINTS_CRASHES, new_config[ConfigKey.POINTS_CRASHES]):
-                new_config[ConfigKey.POINTS_CRASHES] = pristine_defaults[ConfigKey.POINTS_CRASHES]
+            for (key, enum_class) in _KEY_TO_ENUM.items():
+                try:
+                    enum_class(new_config[key])
+                except ValueError:
+                    new_config[key] = pristine_defaults[key]
 
             # That's it!  Stash this away as our "real" version.
             _current_config = new_config
+            _config_version += 1
     except FileNotFoundError as e:
         # Whoops, the file doesn't exist.  Just copy the default in.
         _current_config = _make_default_config()
+        _config_version += 1
         return
 
 def save_config():
@@ -211,17 +183,36 @@ def save_config():
     global _current_config
     global _CONFIG_FILE
 
-    with open(_CONFIG_FILE, 'w') as json_file:
+    # Write it out to a temp file first, then swap that in over the real one.
+    # That way, if someone pulls the plug halfway through, the worst case is a
+    # stray temp file, not a half-written config that gets reset to defaults on
+    # the next boot.
+    temp_file = f'{_CONFIG_FILE}.tmp'
+    with open(temp_file, 'w') as json_file:
         json.dump(_current_config, json_file)
-    os.sync()
+        # Make sure it actually hits the SD card before we swap it in.  Just
+        # this file, though, not everything the system has lying around waiting
+        # to be written (which is what os.sync() would do).
+        json_file.flush()
+        os.fsync(json_file.fileno())
+    os.replace(temp_file, _CONFIG_FILE)
+
+    # And make sure the rename itself sticks, too.
+    dir_fd = os.open(os.path.dirname(os.path.abspath(_CONFIG_FILE)), os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
 
 def set_setting(key: ConfigKey, value: StrEnum):
     """Sets a setting key to the given value, then saves the config back to
     disk.  Raises an exception if something's amiss."""
     global _current_config
+    global _config_version
 
     _validate_or_raise(key, value)
     _current_config[key] = value
+    _config_version += 1
     save_config()
 
 def get_setting(key: ConfigKey) -> any:
@@ -230,3 +221,12 @@ def get_setting(key: ConfigKey) -> any:
     global _current_config
 
     return _current_config[key]
+
+def get_config_version() -> int:
+    """Gets the current config version.  This is just a number that changes
+    every time the config does (on load_config() and set_setting()), so
+    anything that wants to hang on to settings between frames can check this
+    instead of going back for every setting every time."""
+    global _config_version
+
+    return _config_version
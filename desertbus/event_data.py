@@ -4,7 +4,7 @@
 
 from typing import List
 from enum import Enum, auto
-from desertbus.simple_animation_view import SimpleAnimationView
+from desertbus.simple_animation_view import SimpleAnimationView, AnimationSequence
 from desertbus.vst_data import VstData
 
 class Event(Enum):
@@ -61,7 +61,7 @@ BUG_SPLAT_ANIM = [
     (100, "   +*G  SPL*+   ","                "),
     (100, "  +*UG  SPLA*+  ","                "),
     (100, " +*BUG  SPLAT*+ ","                "),
-    (100, "+* BUG  SPLAT *+ ","                "),
+    (100, "+* BUG  SPLAT *+","                "),
     (100, "*  BUG  SPLAT  *","                "),
     (100, "   BUG  SPLAT   ","                "),
     (1000,"   BUG  SPLAT   ","                "),
@@ -117,6 +117,13 @@ CRASH_ANIM = [
     (3000,"     CRASH!     ","                "),
 ]
 
+# The above, all ready to play.  These get played every time an event comes in,
+# so there's no sense working out the frame timings all over again each time.
+POINT_GET_SEQUENCE = AnimationSequence(POINT_GET_ANIM)
+CRASH_SEQUENCE = AnimationSequence(CRASH_ANIM)
+BUG_SPLAT_SEQUENCE = AnimationSequence(BUG_SPLAT_ANIM)
+BUS_STOP_SEQUENCE = AnimationSequence(BUS_STOP_ANIM)
+
 def make_views_for_events(lcd, prev_data: VstData, curr_data: VstData) -> List[SimpleAnimationView]:
     """Makes potentially multiple views for in-game events, depending on the
     differences in stats between two points in time.  This is a list because you
@@ -151,12 +158,12 @@ def make_view_for_event(lcd, event: Event, priority: int) -> SimpleAnimationView
     """Makes a single event view."""
     match event:
         case Event.POINT:
-            return SimpleAnimationView(lcd, POINT_GET_ANIM, "Point Get Animation", priority)
+            return SimpleAnimationView(lcd, POINT_GET_SEQUENCE, "Point Get Animation", priority)
         case Event.CRASH:
-            return SimpleAnimationView(lcd, CRASH_ANIM, "Crash Animation", priority)
+            return SimpleAnimationView(lcd, CRASH_SEQUENCE, "Crash Animation", priority)
         case Event.SPLAT:
-            return SimpleAnimationView(lcd, BUG_SPLAT_ANIM, "Bug Splat Animation", priority)
+            return SimpleAnimationView(lcd, BUG_SPLAT_SEQUENCE, "Bug Splat Animation", priority)
         case Event.STOP:
-            return SimpleAnimationView(lcd, BUS_STOP_ANIM, "Bus Stop Animation", priority)
+            return SimpleAnimationView(lcd, BUS_STOP_SEQUENCE, "Bus Stop Animation", priority)
         case _:
             raise ValueError(f'Invalid event enum {event}!')
@@ -1,8 +1,11 @@
 #!/usr/bin/env python3
 
 import time
-import json
-import urllib.request
+import random
+import gzip
+import http.client
+import threading
+import queue
 import logging
 from urllib.error import HTTPError
 from datetime import datetime
@@ -10,10 +13,18 @@ from desertbus import donation_converter
 from desertbus.vst_data import VstData
 from desertbus.shift_data import Shift, get_current_shift
 
+try:
+    # orjson is a good deal quicker than the stock json module and makes less
+    # garbage doing it, which the Pi appreciates.  It's not required, though.
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
 logger = logging.getLogger(__name__)
 
-_URL_PREFIX = 'https://vst.ninja/'
-_IS_OMEGA_URL = f'{_URL_PREFIX}Resources/isitomegashift.html'
+_HOST = 'vst.ninja'
+_IS_OMEGA_PATH = '/Resources/isitomegashift.html'
+_USER_AGENT = 'dbpibus'
 
 # Field names are mostly tentative.
 _JSON_STATS_CATEGORY = "Stats"
@@ -32,6 +43,9 @@ _JSON_RUN_START_TIME = 'Year Start UNIX-Time'
 _JSON_DONATION_DATA_CATEGORY = "Donation Data"
 _JSON_DONATIONS = 'Total Raised'
 
+# The categories under _JSON_STATS_CATEGORY we actually use.
+_JSON_PARSED_CATEGORIES = (_JSON_GAME_DATA_CATEGORY, _JSON_YEAR_DATA_CAGEGORY, _JSON_DONATION_DATA_CATEGORY)
+
 _YEAR_OFFSET = 2006
 # Floats should be okay here, unless Python has issues with the hundredths digit.
 # It might, you never know.
@@ -40,56 +54,264 @@ _MILES_TO_VEGAS = 360
 _MILLIS_PER_MINUTE = 1000 * 60
 _MILLIS_PER_HOUR = _MILLIS_PER_MINUTE * 60
 _TIMEOUT_SECS = 20
+# If the network flakes out mid-fetch, how many more times to try, and how long
+# to wait before the first retry (it doubles each time after, plus a little
+# jitter).
+_NETWORK_RETRIES = 3
+_RETRY_BASE_SECS = 0.5
+_RETRY_JITTER_SECS = 0.2
+# Outside of the run, there's no Omega Shift to check for, so once the stats say
+# the run isn't live, we only bother asking about it this often.
+_OMEGA_OFFSEASON_RECHECK_SECS = 3600
 
-def _make_stats_url_for_year(year):
+def _make_stats_path_for_year(year):
     numbered_run = year - _YEAR_OFFSET
-    return f'{_URL_PREFIX}DB{numbered_run}/data/DB{numbered_run}_stats_v2.json'
+    return f'/DB{numbered_run}/data/DB{numbered_run}_stats_v2.json'
 
-def get_current_stats() -> VstData:
-    """Fetches the current stats from the VST."""
-    # First, try for this year.
-    year = datetime.now().year
-    json_data = None
+# Each thread that fetches stuff (the fetcher thread and the Omega worker) keeps
+# its own connection to the VST open between fetches, so we're not doing a
+# whole new TCP and TLS handshake every 30 seconds.  http.client connections
+# aren't thread-safe, hence one per thread.
+_connections = threading.local()
+
+def _http_get(path: str, headers: dict=None) -> tuple:
+    """GETs the given path from the VST over this thread's connection.  Returns
+    (status, headers, body).  If a kept-alive connection turns out to have gone
+    stale (the server is free to hang up on it between fetches), this
+    reconnects and tries once more; errors on a fresh connection are thrown
+    right back."""
+    # The stats JSON compresses really well, so ask for it gzipped.  http.client
+    # won't undo that for us, so that's on us, too.
+    request_headers = {'User-Agent': _USER_AGENT, 'Accept-Encoding': 'gzip'}
+    if headers is not None:
+        request_headers.update(headers)
+
+    while True:
+        connection = getattr(_connections, 'connection', None)
+        reused = connection is not None
+        if connection is None:
+            connection = http.client.HTTPSConnection(_HOST, timeout=_TIMEOUT_SECS)
+            _connections.connection = connection
+
+        try:
+            connection.request('GET', path, headers=request_headers)
+            response = connection.getresponse()
+            body = response.read()
+            if response.headers.get('Content-Encoding', '').lower() == 'gzip':
+                body = gzip.decompress(body)
+            return (response.status, response.headers, body)
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            _connections.connection = None
+            if not reused:
+                raise
+            logger.debug('Kept-alive connection went stale, reconnecting...')
+
+def _trim_stats(json_blob):
+    """Trims the stats JSON down to just the categories _parse_stats() actually
+    looks at.  The full blob has a bunch more in it that we'd otherwise be
+    hanging on to in the cache for no reason."""
+    stats = json_blob.get(_JSON_STATS_CATEGORY)
+    if stats is None:
+        return json_blob
+    return {_JSON_STATS_CATEGORY: {category: stats.get(category) for category in _JSON_PARSED_CATEGORIES}}
+
+def _http_get_with_retries(path: str, headers: dict=None) -> tuple:
+    """Same as _http_get(), but if the network flakes out, this tries again a
+    few times (backing off a bit more each time) before giving up.  An HTTP
+    error status isn't a network problem, so that just gets returned like
+    normal."""
+    attempt = 0
+    while True:
+        try:
+            return _http_get(path, headers)
+        except (OSError, http.client.HTTPException) as e:
+            if attempt >= _NETWORK_RETRIES:
+                raise
+            delay_secs = _RETRY_BASE_SECS * (2 ** attempt) + random.random() * _RETRY_JITTER_SECS
+            attempt += 1
+            logger.warning(f'Network trouble fetching {path} ({e}), retrying in {delay_secs:.2f} seconds...')
+            time.sleep(delay_secs)
+
+# The last thing we got from each path (already parsed), along with the ETag
+# and Last-Modified headers that came with it, as (etag, last_modified,
+# parsed).  The next fetch sends those headers back, and if the server says
+# nothing's changed (304), we just reuse what we already parsed.
+_response_cache = {}
+
+def _fetch_with_cache(path: str, parse) -> any:
+    """Fetches the given path and runs the body through parse(), asking the
+    server to skip sending it if it hasn't changed since last time (in which
+    case, this just returns whatever parse() made of it last time).  Anything
+    other than a 200 or a 304 gets thrown back to the caller as an
+    HTTPError."""
+    request_headers = {}
+    cached = _response_cache.get(path)
+    if cached is not None:
+        (etag, last_modified, _) = cached
+        if etag is not None:
+            request_headers['If-None-Match'] = etag
+        if last_modified is not None:
+            request_headers['If-Modified-Since'] = last_modified
+
+    (status, response_headers, body) = _http_get_with_retries(path, request_headers)
+    if status == 304 and cached is not None:
+        logger.debug(f'{path} not modified, reusing the last data...')
+        return cached[2]
+    if not status == 200:
+        raise HTTPError(f'https://{_HOST}{path}', status, f'HTTP {status}', response_headers, None)
+
+    parsed = parse(body)
+    etag = response_headers.get('ETag')
+    last_modified = response_headers.get('Last-Modified')
+
+    # Only bother remembering it if the server gave us something to check
+    # against next time.
+    if etag is not None or last_modified is not None:
+        _response_cache[path] = (etag, last_modified, parsed)
+    else:
+        _response_cache.pop(path, None)
+
+    return parsed
+
+def _parse_stats_body(body: bytes):
+    """Turns the stats JSON body into the (trimmed-down) dict _parse_stats()
+    wants."""
+    return _trim_stats(_json_loads(body))
 
+def _fetch_stats_json(path: str):
+    """Fetches and parses the stats JSON at the given path."""
+    return _fetch_with_cache(path, _parse_stats_body)
+
+def _fetch_stats_json_for_year(year: int):
+    """Fetches the stats JSON for the given year's run.  If that year doesn't
+    have any data yet, this tries the year before instead."""
     try:
         logger.debug(f'Fetching data for {year}...')
-        with urllib.request.urlopen(_make_stats_url_for_year(year), timeout=_TIMEOUT_SECS) as response:
-            json_data = json.loads(response.read())
+        return _fetch_stats_json(_make_stats_path_for_year(year))
     except HTTPError as e:
         if e.code == 404:
             # Whoops, it doesn't exist yet.  Back off a year.  If THIS doesn't
             # work, then we throw.
             logger.debug(f'{year} has no data yet, trying again with {year - 1}...')
-            with urllib.request.urlopen(_make_stats_url_for_year(year - 1), timeout=_TIMEOUT_SECS) as response:
-                json_data = json.loads(response.read())
+            return _fetch_stats_json(_make_stats_path_for_year(year - 1))
         else:
             # Any other error, we throw it back.
             raise e
 
-    # Also, check if it's omega or not.
+def _parse_omega_body(body: bytes) -> bool | None:
+    """Turns the Omega response into True or False, or None if it's neither."""
+    # The Omega response should ONLY be a 0 or 1.  If it's neither, keep the
+    # response as None so the caller knows not to do anything with it.  There's
+    # no need to go through int() for that; just check the bytes.
+    omega_response = body.strip()
+    if omega_response == b'0':
+        return False
+    if omega_response == b'1':
+        return True
+    logger.warning(f'Got a weird Omega Shift response: {omega_response[:16]!r}')
+    return None
+
+def _fetch_omega() -> bool | None:
+    """Checks if it's Omega Shift or not.  Returns None if something went wrong
+    and we couldn't tell either way."""
     omega = None
     try:
         logger.debug('Checking if Omega Shift is live...')
-        with urllib.request.urlopen(_IS_OMEGA_URL, timeout=_TIMEOUT_SECS) as response:
-            # The Omega response should ONLY be a 0 or 1.  If it's neither, keep
-            # the response as None so the caller knows not to do anything with
-            # it.
-            omega_response = int(response.read())
-            if omega_response == 0:
-                omega = False
-            elif omega_response == 1:
-                omega = True
+        omega = _fetch_with_cache(_IS_OMEGA_PATH, _parse_omega_body)
     except:
         # If there's any sort of exception, just let it fly; the omega variable
         # will stay as None.
         logger.exception('Something went wrong fetching the Omega Shift flag!')
 
+    return omega
+
+class _OmegaCheckThread(threading.Thread):
+    """The stats and the Omega flag come from two separate requests that don't
+    depend on each other, so the Omega check goes off on this while the stats
+    fetch runs on the caller's thread.  There's only the one of these, and it
+    sticks around for good, so its connection to the VST stays open between
+    checks the same as the fetcher thread's does.
+
+    This is a daemon thread, same as FetcherThread.  A Ctrl-C or a SIGTERM
+    should quit right away, not wait out whatever timeouts and retries the
+    Omega request is stuck in."""
+    def __init__(self):
+        threading.Thread.__init__(self, daemon=True, name='OmegaFetch')
+        # Each request is the queue its answer goes back on.  That way, if a
+        # caller gives up on one (say, the stats fetch blew up in the
+        # meantime), its answer can't end up going to the next caller.
+        self._requests = queue.SimpleQueue()
+
+    def request_check(self) -> queue.SimpleQueue:
+        """Asks for an Omega check.  The answer (see _fetch_omega()) will show
+        up on the returned queue once it's done."""
+        reply = queue.SimpleQueue()
+        self._requests.put(reply)
+        return reply
+
+    def run(self):
+        while True:
+            reply = self._requests.get()
+            reply.put(_fetch_omega())
+
+# The Omega worker.  It gets started the first time it's needed, not on import.
+# There's only ever one caller (the fetcher thread), so there's no need to lock
+# around that.
+_omega_check_thread = None
+
+def _request_omega_check() -> queue.SimpleQueue:
+    """Kicks off an Omega check on the Omega worker, starting it up if need be.
+    Returns the queue the answer will show up on."""
+    global _omega_check_thread
+    if _omega_check_thread is None:
+        _omega_check_thread = _OmegaCheckThread()
+        _omega_check_thread.start()
+    return _omega_check_thread.request_check()
+
+# Until when (in monotonic seconds) we're not bothering with the Omega check.
+# This gets set whenever we check, the stats say the run isn't live, and the
+# check came back with Omega off.
+_skip_omega_until_secs = 0
+
+def get_current_stats() -> VstData:
+    """Fetches the current stats from the VST."""
+    global _skip_omega_until_secs
+
+    # Kick off the Omega check first, then get the stats for this year while
+    # that's in flight.  Unless the run's not live, in which case don't.
+    skip_omega = time.monotonic() < _skip_omega_until_secs
+    omega_reply = None if skip_omega else _request_omega_check()
+    json_data = _fetch_stats_json_for_year(datetime.now().year)
+    # If we skipped the check, we don't know anything about Omega, so say so.
+    # That's None, NOT False; False would mean we checked and Omega's over,
+    # and the display would drop out of Omega on the strength of nothing.
+    omega = None
+    if omega_reply is not None:
+        omega = omega_reply.get()
+
     # Now we've got data!  Let's get it parsed!  Make it its own method to keep
     # things tidy and well-organized.
     logger.debug('Fetch complete, parsing now.')
-    return _parse_stats(json_data, omega)
+    results = _parse_stats(json_data, omega)
+
+    if results.is_live:
+        if skip_omega:
+            # The run just went live!  Don't wait out the rest of the hour to
+            # find out about Omega Shift; check now and parse again.
+            logger.debug('The run is live again, checking Omega Shift...')
+            results = _parse_stats(json_data, _fetch_omega())
+        _skip_omega_until_secs = 0
+    elif omega is False:
+        # We just checked, the run's not live, and Omega's definitely over.
+        # Don't check again for a while.  If Omega's still on (or we couldn't
+        # tell), keep checking every fetch, or the display could be stuck in
+        # Omega for the rest of the hour after it actually ends.
+        _skip_omega_until_secs = time.monotonic() + _OMEGA_OFFSEASON_RECHECK_SECS
+
+    return results
 
-def _parse_stats(json_blob, omega: bool) -> VstData:
+def _parse_stats(json_blob, omega: bool | None) -> VstData:
     """Parses the raw VST results into a VstData object."""
     stats = json_blob.get(_JSON_STATS_CATEGORY)
     year_data = stats.get(_JSON_YEAR_DATA_CAGEGORY)
@@ -105,15 +327,15 @@ def _parse_stats(json_blob, omega: bool) -> VstData:
         # doesn't parse to float.
         pass
     miles_driven = miles_total - _ODOMETER_OFFSET
-    trips_taken = miles_driven // _MILES_TO_VEGAS
-    is_going_to_tucson = False
-    if trips_taken >= 0 and trips_taken % 2 == 1:
-        is_going_to_tucson = True
+    # Every other trip is back to Tucson.  Before the run starts, the odometer
+    # reads under the offset, and that's a trip to Vegas.
+    trips_taken = int(miles_driven // _MILES_TO_VEGAS) if miles_driven > 0 else 0
+    is_going_to_tucson = bool(trips_taken & 1)
 
-    start_time_millis = year_data.get(_JSON_RUN_START_TIME, 0) * 1000
-    right_now_millis = round(time.time() * 1000)
-    hours_bussed = (right_now_millis - start_time_millis) // _MILLIS_PER_HOUR
-    minutes_bussed = ((right_now_millis - start_time_millis) % _MILLIS_PER_HOUR) // _MILLIS_PER_MINUTE
+    start_time_millis = int(year_data.get(_JSON_RUN_START_TIME, 0)) * 1000
+    right_now_millis = time.time_ns() // 1_000_000
+    (hours_bussed, leftover_millis) = divmod(right_now_millis - start_time_millis, _MILLIS_PER_HOUR)
+    minutes_bussed = leftover_millis // _MILLIS_PER_MINUTE
 
     donation_total = float(donation_data.get(_JSON_DONATIONS, 0.0))
     to_next_hour = donation_converter.to_next_hour_from_donation_amount(donation_total)
@@ -126,6 +348,7 @@ def _parse_stats(json_blob, omega: bool) -> VstData:
         current_shift = get_current_shift()
 
     return VstData(time_fetched = right_now_millis,
+                   time_fetched_monotonic = time.monotonic_ns() // 1_000_000,
                    donation_total = donation_total,
                    hours_bussed = hours_bussed,
                    minutes_bussed = minutes_bussed,
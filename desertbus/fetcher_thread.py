@@ -1,12 +1,19 @@
 #!/usr/bin/env python3
 
 import logging
-from threading import Thread, Lock
-import time
+from threading import Thread, Event
+import random
 from desertbus import fetcher
 
 logger = logging.getLogger(__name__)
 
+# How long to wait between fetches when things are going fine, give or take a
+# little jitter so a bunch of these don't all hit the VST in lockstep.
+_FETCH_INTERVAL_SECS = 30
+_FETCH_JITTER_SECS = 2
+# When fetches keep failing, the wait doubles each time, up to this.
+_MAX_BACKOFF_SECS = 300
+
 class FetcherThread(Thread):
     """The main VST data-fetching thread.  This is intended to be kicked off as
     soon as there's a network connection and kept up for the duration of the
@@ -15,36 +22,69 @@ class FetcherThread(Thread):
     def __init__(self, name):
         Thread.__init__(self, daemon=True, name=name)
         self.name = name
+        # Only ever replaced wholesale with a new (frozen) VstData, never
+        # changed in place, so reading it doesn't need a lock; you either get
+        # the old one or the new one.
         self._latest_stats = None
-        self._lock = Lock()
+        # Set whenever new stats come in, so the main loop can wake up for them
+        # right away instead of finding out on its next poll.
+        self._stats_event = Event()
+        # Set to get the thread to quit.
+        self._stop_event = Event()
+        # What the thread waits on between fetches.  stop() sets it to cut the
+        # wait short, so the thread notices right away.
+        self._wake_event = Event()
 
     @property
     def latest_stats(self):
-        """Gets the latest stats fetched on this thread.  Does all the locking
-        and such as need be, too.  Returns None if nothing's been fetched
-        yet."""
-        self._lock.acquire(timeout=30)
-        to_return = self._latest_stats
-        self._lock.release()
-        return to_return
+        """Gets the latest stats fetched on this thread.  Returns None if
+        nothing's been fetched yet.
+
+        VstData is frozen, so whatever this hands back is a complete snapshot;
+        the fetcher thread never changes it in place, it only ever swaps in a
+        whole new one."""
+        return self._latest_stats
+
+    def wait_for_stats(self, timeout: float) -> bool:
+        """Waits up to timeout seconds for new stats to arrive.  Returns True if
+        new stats came in since the last call (in which case this returns
+        immediately), False if the timeout expired first.  This is meant to
+        replace a plain sleep in the main loop."""
+        if self._stats_event.wait(timeout):
+            self._stats_event.clear()
+            return True
+        return False
+
+    def stop(self):
+        """Tells the thread to quit.  It'll finish whatever fetch it's in the
+        middle of first, if any."""
+        self._stop_event.set()
+        self._wake_event.set()
 
     def run(self):
         logger.info('The fetcher thread is going live!')
-        while True:
+        failure_count = 0
+        while not self._stop_event.is_set():
             try:
                 results = fetcher.get_current_stats()
                 logger.debug(f'Fetched stats: {results}')
 
                 if results is not None:
-                    # Since we're the only ones writing to this, we really,
-                    # REALLY shouldn't need the timeout, but...
-                    self._lock.acquire(timeout=30)
+                    # Swap in the new stats, then let the main loop know.
                     self._latest_stats = results
-                    self._lock.release()
+                    self._stats_event.set()
+                failure_count = 0
+                delay_secs = _FETCH_INTERVAL_SECS + random.uniform(-_FETCH_JITTER_SECS, _FETCH_JITTER_SECS)
             except Exception as e:
-                # Wuh oh.
+                # Wuh oh.  Back off a bit; if the VST is down, hammering it
+                # every 30 seconds isn't going to bring it back any faster.
                 logger.exception('Fetching exception!')
+                delay_secs = min(_FETCH_INTERVAL_SECS * (2 ** failure_count), _MAX_BACKOFF_SECS)
+                failure_count += 1
+
+            logger.debug(f'Sleeping for {delay_secs:.1f} seconds...')
+            if self._wake_event.wait(delay_secs):
+                self._wake_event.clear()
 
-            logger.debug('Sleeping for 30 seconds...')
-            time.sleep(30)
+        logger.info('The fetcher thread is stopping.')
 
@@ -1,16 +1,13 @@
 #!/usr/bin/env python3
 
-from desertbus.base_view import BaseView
+from desertbus.base_view import BaseView, monotonic_millis
 from desertbus.vst_data import VstData, needs_service_dot
 from desertbus.button_handler import ButtonData
-from desertbus.service_credit_view import ServiceCreditView
-from desertbus.service_menu_view import ServiceMenuView
 from desertbus.shift_data import PACIFIC_ZONEINFO
-from desertbus.config import ConfigKey, get_setting, ShowTime, TimeFormat, DateFormat, PointsCrashes
+from desertbus.config import ConfigKey, get_setting, get_config_version, ShowTime, TimeFormat, DateFormat, PointsCrashes
 from datetime import datetime
 from enum import Enum, auto
 import time
-import copy
 import adafruit_character_lcd.character_lcd as characterlcd
 import logging
 
@@ -26,38 +23,54 @@ class Season(Enum):
     # The run is over and we are waiting on the next one.
     OFFSEASON = auto()
 
-def _route_page(data: VstData) -> str:
-    if data.is_going_to_tucson:
-        return "Vegas -> Tucson"
-    else:
-        return "Tucson -> Vegas"
+# Every page takes the data and the current time (millis since the epoch), and
+# returns the text for the top line.  Most of them ignore the time.
+
+# Indexed by is_going_to_tucson (False is 0, True is 1).
+_ROUTES = ("Tucson -> Vegas", "Vegas -> Tucson")
+
+def _route_page(data: VstData, now_millis: int) -> str:
+    return _ROUTES[data.is_going_to_tucson]
 
-def _to_next_hour_page(data: VstData) -> str:
-    return f"Next: ${data.to_next_hour:,.2f}"
+# The page text templates, as bound format methods so the templates themselves
+# only get looked up the once.
+_NEXT_FORMAT = "Next: ${:,.2f}".format
+_BUSSED_FORMAT = "Bussed: {}:{:02}".format
+_TOTAL_HOURS_FORMAT = "Total hours: {}".format
+_POINTS_FORMAT = "Points: {}".format
+_CRASHES_FORMAT = "Crashes: {}".format
+_PT_CR_FORMAT = "PT:CR: {}:{}".format
+_SPLATS_FORMAT = "Bug splats: {}".format
+_STOPS_FORMAT = "Bus stops: {}".format
+# The donation total line, with room on the end for the service dot.
+_DONATION_FORMAT = "${:,.2f}{}".format
 
-def _hours_bussed_page(data: VstData) -> str:
-    return f"Bussed: {data.hours_bussed}:{data.minutes_bussed:02}"
+def _to_next_hour_page(data: VstData, now_millis: int) -> str:
+    return _NEXT_FORMAT(data.to_next_hour)
 
-def _total_hours_page(data: VstData) -> str:
-    return f"Total hours: {data.total_hours}"
+def _hours_bussed_page(data: VstData, now_millis: int) -> str:
+    return _BUSSED_FORMAT(data.hours_bussed, data.minutes_bussed)
 
-def _total_points_page(data: VstData) -> str:
-    return f"Points: {data.points}"
+def _total_hours_page(data: VstData, now_millis: int) -> str:
+    return _TOTAL_HOURS_FORMAT(data.total_hours)
 
-def _total_crashes_page(data: VstData) -> str:
-    return f"Crashes: {data.points}"
+def _total_points_page(data: VstData, now_millis: int) -> str:
+    return _POINTS_FORMAT(data.points)
 
-def _pt_cr_page(data: VstData) -> str:
-    return f"PT:CR: {data.points}:{data.crashes}"
+def _total_crashes_page(data: VstData, now_millis: int) -> str:
+    return _CRASHES_FORMAT(data.crashes)
 
-def _total_splats_page(data: VstData) -> str:
-    return f"Bug splats: {data.splats}"
+def _pt_cr_page(data: VstData, now_millis: int) -> str:
+    return _PT_CR_FORMAT(data.points, data.crashes)
 
-def _total_stops_page(data: VstData) -> str:
-    return f"Bus stops: {data.stops}"
+def _total_splats_page(data: VstData, now_millis: int) -> str:
+    return _SPLATS_FORMAT(data.splats)
 
-def _run_starts_in(data: VstData) -> str:
-    millis_until = data.start_time_millis - (time.time() * 1000)
+def _total_stops_page(data: VstData, now_millis: int) -> str:
+    return _STOPS_FORMAT(data.stops)
+
+def _run_starts_in(data: VstData, now_millis: int) -> str:
+    millis_until = data.start_time_millis - now_millis
     if millis_until < 0:
         # The start time has passed, but we don't have the is_live flag yet.
         # This is only possible if the run's supposedly started but we don't
@@ -65,16 +78,34 @@ def _run_starts_in(data: VstData) -> str:
         # made that fetch yet.
         return "Starting soon..."
 
-    hours = int(millis_until // _MILLIS_PER_HOUR)
-    minutes = int((millis_until % _MILLIS_PER_HOUR) // _MILLIS_PER_MINUTE)
-    seconds = int((millis_until % _MILLIS_PER_MINUTE) // 1000)
+    (minutes, seconds) = divmod(millis_until // 1000, 60)
+    (hours, minutes) = divmod(minutes, 60)
 
     # We really shouldn't get 1000+ hour differences here, but...
     return f"{"Start" if hours < 1000 else "Go"}: {hours}:{minutes:02d}:{seconds:02d}"
 
-def _time_date_page(data: VstData) -> str:
+# How each date format gets written out, given a datetime.
+_DATE_FORMATTERS = {
+    DateFormat.YYYYMMDD: '{0.year}/{0.month:02d}/{0.day:02d}'.format,
+    DateFormat.DDMMYYYY: '{0.day:02d}/{0.month:02d}/{0.year}'.format,
+    DateFormat.MMDDYYYY: '{0.month:02d}/{0.day:02d}/{0.year}'.format,
+}
+
+# The last time/date page we made, as ((minute, config version), text).  It
+# only shows hours and minutes, so it can't change any more often than that
+# (Pacific time is a whole number of hours off from UTC, so its minutes tick
+# over right along with the epoch's), or when the time/date format settings do.
+_time_date_cache = (None, '')
+
+def _time_date_page(data: VstData, now_millis: int) -> str:
+    global _time_date_cache
+
+    cache_key = (now_millis // _MILLIS_PER_MINUTE, get_config_version())
+    if _time_date_cache[0] == cache_key:
+        return _time_date_cache[1]
+
     # We don't have much space to work with here.
-    right_now = datetime.now(PACIFIC_ZONEINFO)
+    right_now = datetime.fromtimestamp(now_millis / 1000, PACIFIC_ZONEINFO)
 
     display_hour = right_now.hour
     ampm = ' '
@@ -89,18 +120,13 @@ def _time_date_page(data: VstData) -> str:
 
     time_string = f'{display_hour:02d}:{right_now.minute:02d}{ampm}'
 
-    date_string = ''
-    match get_setting(ConfigKey.DATE_FORMAT):
-        case DateFormat.YYYYMMDD:
-            date_string = f'{right_now.year}/{right_now.month:02d}/{right_now.day:02d}'
-        case DateFormat.DDMMYYYY:
-            date_string = f'{right_now.day:02d}/{right_now.month:02d}/{right_now.year}'
-        case DateFormat.MMDDYYYY:
-            date_string = f'{right_now.month:02d}/{right_now.day:02d}/{right_now_year}'
+    date_formatter = _DATE_FORMATTERS.get(get_setting(ConfigKey.DATE_FORMAT))
+    date_string = date_formatter(right_now) if date_formatter is not None else ''
 
+    _time_date_cache = (cache_key, time_string + date_string)
     return time_string + date_string
 
-_LIVE_PAGES = [
+_LIVE_PAGES = (
     _route_page,
     _to_next_hour_page,
     _hours_bussed_page,
@@ -109,21 +135,25 @@ _LIVE_PAGES = [
     _total_crashes_page,
     _total_splats_page,
     _total_stops_page,
-]
+)
 
-_OFFSEASON_PAGES = [
+_OFFSEASON_PAGES = (
     _total_hours_page,
     _total_points_page,
     _total_crashes_page,
     _total_splats_page,
     _total_stops_page,
-]
+)
 
-_PRESEASON_PAGES = [
+_PRESEASON_PAGES = (
     _to_next_hour_page,
     _total_hours_page,
     _run_starts_in,
-]
+)
+
+# Pages whose text depends on what time it is, not just on the data.  These
+# can't be skipped just because nothing else changed since last frame.
+_CLOCK_PAGES = (_run_starts_in, _time_date_page)
 
 _TOTAL_LIVE_PAGES = len(_LIVE_PAGES)
 _TOTAL_OFFSEASON_PAGES = len(_OFFSEASON_PAGES)
@@ -131,53 +161,64 @@ _TOTAL_PRESEASON_PAGES = len(_PRESEASON_PAGES)
 _LIVE_PAGE_TIME_SECS = 4
 _OFFSEASON_PAGE_TIME_SECS = 6
 _COUNTUP_ANIMATION_MILLIS = 1000
+# When nothing's animating and no new data's come in, the screen only needs
+# working out this often.  Nothing on it changes any faster than once a second
+# anyway, outside of the count-up.
+_RENDER_INTERVAL_MILLIS = 250
 _MILLIS_PER_MINUTE = 1000 * 60
 _MILLIS_PER_HOUR = _MILLIS_PER_MINUTE * 60
 
-def _get_in_run_pages() -> list:
-    pages = copy.copy(_LIVE_PAGES)
-
-    _resolve_pt_cr(pages)
+def _get_in_run_pages() -> tuple:
+    pages = _resolve_pt_cr(_LIVE_PAGES)
 
     if get_setting(ConfigKey.SHOW_TIME_IN_RUN) == ShowTime.YES:
-        pages.append(_time_date_page)
+        pages = pages + (_time_date_page,)
 
     return pages
 
-def _get_preseason_pages() -> list:
-    pages = copy.copy(_PRESEASON_PAGES)
-
-    _resolve_pt_cr(pages)
+def _get_preseason_pages() -> tuple:
+    pages = _resolve_pt_cr(_PRESEASON_PAGES)
 
     if get_setting(ConfigKey.SHOW_TIME_IN_PRESEASON) == ShowTime.YES:
-        pages.append(_time_date_page)
+        pages = pages + (_time_date_page,)
 
     return pages
 
-def _get_offseason_pages() -> list:
-    pages = copy.copy(_OFFSEASON_PAGES)
-
-    _resolve_pt_cr(pages)
+def _get_offseason_pages() -> tuple:
+    pages = _resolve_pt_cr(_OFFSEASON_PAGES)
 
     if get_setting(ConfigKey.SHOW_TIME_IN_OFFSEASON) == ShowTime.YES:
-        pages.append(_time_date_page)
+        pages = pages + (_time_date_page,)
 
     return pages
 
-def _resolve_pt_cr(pages: list):
+def _resolve_pt_cr(pages: tuple) -> tuple:
     if get_setting(ConfigKey.POINTS_CRASHES) == PointsCrashes.PTCR:
-        # Insert PT:CR before where points is...
-        index = pages.index(_total_points_page)
-        pages.insert(index, _pt_cr_page)
-
-        # ...then, delete points and crashes.
-        pages.remove(_total_points_page)
-        pages.remove(_total_crashes_page)
-
-def _get_season(data: VstData) -> Season:
-    """Gets the current season."""
-    right_now_millis = time.time() * 1000
+        # Put PT:CR where points is, and drop crashes.  If there's no points
+        # page in the first place (as in the preseason), there's nothing to
+        # do.
+        return tuple(_pt_cr_page if page is _total_points_page else page
+                     for page in pages
+                     if page is not _total_crashes_page)
+    return pages
 
+def _get_pages_for_season(season: Season) -> tuple:
+    """Gets the pages to cycle through in the given season, and how long (in
+    seconds) each one stays up, as (pages, page_time_secs).  This depends on
+    the current settings, so call it again if those change."""
+    match season:
+        case Season.PRESEASON:
+            return (_get_preseason_pages(), _OFFSEASON_PAGE_TIME_SECS)
+        case Season.IN_RUN:
+            return (_get_in_run_pages(), _LIVE_PAGE_TIME_SECS)
+        case Season.OFFSEASON:
+            return (_get_offseason_pages(), _OFFSEASON_PAGE_TIME_SECS)
+        case _:
+            raise ValueError(f'Invalid season {season}!')
+
+def _get_season(data: VstData, right_now_millis: int) -> Season:
+    """Gets the current season, as of right_now_millis (millis since the
+    epoch)."""
     if data.start_time_millis > right_now_millis or (not data.is_live and data.start_time_millis + (_MILLIS_PER_MINUTE * 15) > right_now_millis):
         # If the start time is AFTER now regardless of the live flag, this must
         # mean the data we got is an UPCOMING run's time, which means we're in
@@ -206,28 +247,53 @@ class NormalView(BaseView):
         super().__init__(lcd)
         # The last time we swapped data pages.
         logger.info("Initializing NormalView!")
-        self._start_time = time.time()
+        self._start_time = monotonic_millis()
 
         # The last "stabilized" donation total, meaning the last time a final
         # count was displayed.  This will only be different from the last
         # displayed count or what's in the incoming data when updating to a
         # new value and in the middle of an animation.
         self._last_stabilized_donations = 0
-        # The last time we had a stabilized donation total.  This is used to
-        # calculate how much we need to increase the amount per frame during an
-        # animation.  This initializes to zero and not self._start_time * 1000
-        # to make sure we're starting at the first actual frame, not at init.
-        self._last_stabilized_time_millis = 0
+        # The last time we had a stabilized donation total, in monotonic millis.
+        # This is used to calculate how much we need to increase the amount per
+        # frame during an animation.  This initializes to None and not
+        # self._start_time to make sure we're starting at the first actual
+        # frame, not at init.
+        self._last_stabilized_time_millis = None
         # The last-known season.  If this changes, we need to reset all page
         # counters.
         self._last_known_season = None
-        # The last time a page was changed, in seconds since the epoch.  This
-        # is updated both when the page timer expires and when the user presses
-        # the plus/minus buttons.
-        self._last_page_time_secs = 0
+        # The last time a page was changed, in monotonic millis.  This is
+        # updated both when the page timer expires and when the user presses
+        # the plus/minus buttons.  It's None right after a button press, until
+        # the next frame starts the timer over from that frame's timestamp.
+        self._last_page_time_millis = 0
         # The number of pages that have been advanced since the last reset.
         # This is modulo'd to determine what page we're actually viewing.
         self._page_counter = 0
+        # The pages we're cycling through and how long each one stays up.  The
+        # page list only depends on the season and the settings, so it's only
+        # rebuilt when one of those changes; _pages_key is what it was built
+        # for, as (season, config version).
+        self._pages_key = None
+        self._pages = ()
+        self._page_time_millis = _OFFSEASON_PAGE_TIME_SECS * 1000
+        # What went into the last thing we put on screen (page, data, displayed
+        # donation total, service dot), and what that came out to.  If none of
+        # that's changed, neither has the text, so there's no need to build it
+        # all over again.
+        self._last_render_key = None
+        self._last_message = None
+        # The last donation line we built, as (cents, service dot, line).
+        # During a count-up animation, the total changes every frame but the
+        # line itself only changes once a whole cent ticks over.
+        self._donation_line_cache = (None, False, '')
+        # When (in monotonic millis) we next need to work out what's on screen,
+        # and the data we last did that with.  Until then, if the data's the
+        # same (or a new fetch that came back equal to it) and there's no
+        # count-up going, we just keep showing what we showed last.
+        self._next_render_millis = 0
+        self._last_rendered_data = None
 
     @property
     def priority(self):
@@ -237,10 +303,10 @@ class NormalView(BaseView):
         # system.
         return 9999
 
-    def _get_displayed_donation_total(self, data: VstData) -> float:
+    def _get_displayed_donation_total(self, data: VstData, right_now_millis: int) -> float:
         """Gets the displayed donation total, accounting for any potential
-        animation currently active."""
-        right_now_millis = time.time() * 1000
+        animation currently active, as of right_now_millis (monotonic
+        millis)."""
 
         if self._last_stabilized_donations == data.donation_total:
             # We're stabilized; update the counter and return the total.
@@ -253,7 +319,10 @@ class NormalView(BaseView):
             elapsed_time = right_now_millis - self._last_stabilized_time_millis
             progress_percent = elapsed_time / _COUNTUP_ANIMATION_MILLIS
 
-            if progress_percent >= 1.0:
+            # If the new total shows up as the same dollars and cents as the
+            # old one, there's nothing to count up through, so just call it
+            # done right away.
+            if progress_percent >= 1.0 or round(data.donation_total, 2) == round(self._last_stabilized_donations, 2):
                 # We've reached the end!  Display the actual total and
                 # stabilize.
                 logger.info(f'Ending animation at ${data.donation_total}.')
@@ -266,86 +335,136 @@ class NormalView(BaseView):
                 fractional_delta = donation_difference * progress_percent
                 return round(self._last_stabilized_donations + fractional_delta, 2)
 
+    def _get_donation_line(self, displayed_total: float, displayed_cents: int, service_dot: bool) -> str:
+        """Gets the (centered) donation line for the given total, reusing the
+        last one if it'd come out the same."""
+        (cached_cents, cached_dot, cached_line) = self._donation_line_cache
+        if cached_cents == displayed_cents and cached_dot == service_dot:
+            return cached_line
+
+        line = _DONATION_FORMAT(displayed_total, '.' if service_dot else '').center(16)
+        self._donation_line_cache = (displayed_cents, service_dot, line)
+        return line
+
     def handle_buttons(self, data: any, buttons: ButtonData) -> BaseView:
         to_return = None
         if self._previous_buttons is not None:
+            # These two don't get imported until somebody actually presses the
+            # button for them.  Most of the time, nobody does, and the service
+            # menu's a lot of module to load for nothing at startup.
             if buttons.back and not self._previous_buttons.back:
+                from desertbus.service_credit_view import ServiceCreditView
                 to_return = ServiceCreditView(self._lcd)
             elif buttons.select and not self._previous_buttons.select:
+                from desertbus.service_menu_view import ServiceMenuView
                 to_return = ServiceMenuView(self._lcd)
             elif buttons.minus and not self._previous_buttons.minus:
                 self._page_counter -= 1
                 # Reset the last page time, too!  We want this new page to
-                # display for the full time it should.
-                self._last_page_time_secs = time.time()
+                # display for the full time it should.  And show it NOW.  The
+                # page timer starts over on the next frame, going by that
+                # frame's timestamp like everything else in it.
+                self._last_page_time_millis = None
+                self._next_render_millis = 0
             elif buttons.plus and not self._previous_buttons.plus:
                 self._page_counter += 1
                 # Ditto!
-                self._last_page_time_secs = time.time()
+                self._last_page_time_millis = None
+                self._next_render_millis = 0
 
         self._previous_buttons = buttons
         return to_return
 
-    def next_frame(self, data: any) -> bool:
-        # This really super needs to have a VstData to do something.
-        if not isinstance(data, VstData):
+    def next_frame(self, data: any, now_millis: int=None) -> bool:
+        # This really super needs to have a VstData to do something.  The main
+        # loop only ever hands us the fetcher's latest stats, which are either
+        # a VstData or None (nothing fetched yet).
+        if data is None:
+            return False
+
+        # Everything below works off these two readings of the clock.  Wall
+        # clock time is for things that happen at a certain time of day (when
+        # the run starts, how stale the data is, what time it is), monotonic
+        # time is for how long things have been going on (page flips, the
+        # count-up animation), so the clock getting fixed by NTP doesn't make
+        # pages jump around.
+        monotonic_now_millis = now_millis if now_millis is not None else monotonic_millis()
+
+        last_rendered_data = self._last_rendered_data
+        if (monotonic_now_millis < self._next_render_millis
+                and (data is last_rendered_data or data == last_rendered_data)
+                and self._last_stabilized_donations == data.donation_total):
+            # Too soon to bother working it all out again.  Still put the last
+            # message up, in case some other view had the screen in between;
+            # if not, _display_message() won't do anything.  We're stabilized
+            # (or we wouldn't be here), so keep that time current, too, so the
+            # next count-up starts from the start.
+            self._last_stabilized_time_millis = monotonic_now_millis
+            self._display_message(self._last_message)
+            self._advance_frame_time(now_millis)
             return False
+        self._next_render_millis = monotonic_now_millis + _RENDER_INTERVAL_MILLIS
+        self._last_rendered_data = data
 
-        right_now_secs = time.time()
-        right_now_millis = right_now_secs * 1000
+        right_now_millis = time.time_ns() // 1_000_000
 
-        if self._last_stabilized_time_millis == 0:
+        if self._last_stabilized_time_millis is None:
             # This is the first frame!  Initialize!
-            self._last_stabilized_time_millis = right_now_millis
+            self._last_stabilized_time_millis = monotonic_now_millis
 
-        line1 = ''
-        pages = []
-        page_time_secs = 10
         # First: Are we in-run?  That determines what pages we show.  Then, the
         # specific page we're on depends on elapsed time.
-        now_season = _get_season(data)
-        match now_season:
-            case Season.PRESEASON:
-                pages = _get_preseason_pages()
-                page_time_secs = _OFFSEASON_PAGE_TIME_SECS
-            case Season.IN_RUN:
-                pages = _get_in_run_pages()
-                page_time_secs = _LIVE_PAGE_TIME_SECS
-            case Season.OFFSEASON:
-                pages = _get_offseason_pages()
-                page_time_secs = _OFFSEASON_PAGE_TIME_SECS
-            case _:
-                raise ValueError(f'Invalid season {now_season}!')
+        now_season = _get_season(data, right_now_millis)
+        pages_key = (now_season, get_config_version())
+        if not pages_key == self._pages_key:
+            (self._pages, page_time_secs) = _get_pages_for_season(now_season)
+            self._page_time_millis = page_time_secs * 1000
+            self._pages_key = pages_key
+        pages = self._pages
 
         if not self._last_known_season == now_season:
             # Uh oh, we've changed seasons.  Reset the page counter!
             self._page_counter = 0
-            self._last_page_time_secs = right_now_secs
+            self._last_page_time_millis = monotonic_now_millis
             self._last_known_season = now_season
 
+        if self._last_page_time_millis is None:
+            # Someone just flipped the page by hand.  Start its timer now.
+            self._last_page_time_millis = monotonic_now_millis
+
         # Determine how many pages should have passed since we last checked.
         # In normal operation, this should be either zero or one, but we'll keep
         # the clock running when NormalView is hidden.
-        time_delta = right_now_secs - self._last_page_time_secs
-        page_delta = int(time_delta // page_time_secs)
+        time_delta = monotonic_now_millis - self._last_page_time_millis
+        page_delta = time_delta // self._page_time_millis
 
         if page_delta > 0:
-            # Pages have advanced!  Reset the last page time for next time!
-            self._last_page_time_secs = right_now_secs
-
-        # Advance this many pages.
-        self._page_counter += page_delta
+            # Pages have advanced!  Reset the last page time for next time, and
+            # advance this many pages.
+            self._last_page_time_millis = monotonic_now_millis
+            self._page_counter += page_delta
 
         # Modulo us to the current page, then grab its text.
-        current_page = int(self._page_counter % len(pages))
-        line1 = pages[current_page](data).center(16)
+        page = pages[self._page_counter % len(pages)]
+        displayed_total = self._get_displayed_donation_total(data, monotonic_now_millis)
+        displayed_cents = round(displayed_total * 100)
+        service_dot = needs_service_dot(data, monotonic_now_millis)
+
+        render_key = (page, data, displayed_cents, service_dot)
+        if not render_key == self._last_render_key or page in _CLOCK_PAGES:
+            line1 = page(data, right_now_millis).center(16)
+
+            # Either way, the second line is the donation total.
+            line2 = self._get_donation_line(displayed_total, displayed_cents, service_dot)
 
-        # Either way, the second line is the donation total.
-        line2 = f"${self._get_displayed_donation_total(data):,.2f}{'.' if needs_service_dot(data) else ''}".center(16)
+            self._last_render_key = render_key
+            self._last_message = line1 + "\n" + line2
 
-        # Display 'em!
-        self._display_text(line1, line2)
+        # Display 'em!  This still goes through even if the text's the same as
+        # last frame, since some other view might've had the screen in the
+        # meantime; _display_message() won't bother the LCD if it hasn't.
+        self._display_message(self._last_message)
 
         # We don't use the frame timer, but still, advance it.
-        self._advance_frame_time()
+        self._advance_frame_time(now_millis)
         return False
@@ -15,7 +15,8 @@ from desertbus.config import load_config, get_setting, set_setting, ConfigKey, S
 
 logger = logging.getLogger(__name__)
 
-_SAVE_DISPLAY_MILLIS = 1000
+# How long "Saved!" stays up after saving a setting, in nanos.
+_SAVE_DISPLAY_NS = 1_000_000_000
 
 class _ReturnType(Enum):
     """The various things that can be returned from a button interaction."""
@@ -64,9 +65,21 @@ class _TestView(Enum):
 
 class _MenuNode(ABC):
     """Some manner of menu node.  This is the good stuff.  Or, rather, the base
-    of the good stuff."""
+    of the good stuff.
+
+    Nodes (and their subclasses) use __slots__, since they get poked at every
+    frame the menu's up.  Any new attributes have to be added to them."""
+    __slots__ = ('_title', '_title_left', '_cached_index', '_cached_display')
+
     def __init__(self, title: str):
         self._title = title
+        # The title as it goes on the top line.
+        self._title_left = title.ljust(16)
+        # What _get_list_display() last came up with, and for which index.
+        # The display only changes when the index does, so there's no need to
+        # pad everything out again every frame.
+        self._cached_index = -1
+        self._cached_display = None
 
     @property
     def title(self) -> str:
@@ -84,62 +97,82 @@ class _MenuNode(ABC):
         """Gets the text to be displayed, as two separate lines."""
         pass
 
+    def on_push(self):
+        """Called whenever this node gets pushed onto the menu stack.  Nodes
+        are made once and reused every time the menu's opened, so anything
+        that needs to be fresh each visit gets refreshed here."""
+        pass
+
+    def _get_list_display(self, items: list) -> (str, str):
+        """Gets the usual display for a node that picks from a list of items:
+        the node's title on top, the currently-selected item's title on the
+        bottom.  This assumes the node keeps the selection in
+        self._current_index."""
+        if not self._cached_index == self._current_index:
+            self._cached_display = (self._title_left, items[self._current_index]['title_right'])
+            self._cached_index = self._current_index
+        return self._cached_display
+
 class _ContainerNode(_MenuNode):
     """A container node contains other nodes.  It's used to navigate the menu
     structure to something like a SettingNode."""
+    __slots__ = ('_children', '_child_nodes', '_current_index')
+
     def __init__(self, title: str, children: list):
         super().__init__(title)
         self._children = children
+        # The child nodes themselves, made once, right here, so going in and
+        # out of menus doesn't keep making new ones.
+        self._child_nodes = [_inflate_node(child) for child in children]
         self._current_index = 0
 
     def handle_buttons(self, buttons: ButtonData) -> (_ReturnType, any):
         if buttons.back:
             return (_ReturnType.POP_STACK, None)
         if buttons.select:
-            new_node = _inflate_node(self._children[self._current_index])
+            new_node = self._child_nodes[self._current_index]
             if not new_node is None:
                 return (_ReturnType.PUSH_MENU, new_node)
         if buttons.minus:
-            self._current_index -= 1
-
-            if self._current_index < 0:
-                self._current_index = len(self._children) - 1
+            self._current_index = (self._current_index - 1) % len(self._children)
         if buttons.plus:
-            self._current_index += 1
-
-            if self._current_index >= len(self._children):
-                self._current_index = 0
+            self._current_index = (self._current_index + 1) % len(self._children)
 
         return (_ReturnType.STAY_HERE, None)
 
     def get_current_display(self) -> (str, str):
         # Top line is this node's title, bottom line is the current selection.
-        return (self.title.ljust(16), self._children[self._current_index]['title'].rjust(16))
+        return self._get_list_display(self._children)
 
 class _SettingNode(_MenuNode):
     """A node that represents a config setting."""
-    def __init__(self, title: str, key: ConfigKey, options: list):
+    __slots__ = ('_key', '_options', '_value_to_index', '_save_time_ns', '_current_index', '_saved_display')
+
+    def __init__(self, title: str, key: ConfigKey, options: list, value_to_index: dict):
         super().__init__(title)
         self._key = key
         self._options = options
+        self._value_to_index = value_to_index
+        # When (in monotonic nanos) the user last saved, or None if they
+        # haven't yet.
+        self._save_time_ns = None
+        # This gets set to the current setting in on_push().  This node gets
+        # made at import time, and the config might not even be loaded yet.
         self._current_index = 0
-        self._save_time_millis = 0
 
-        # Start on whatever the current selection is.
-        initial_setting = get_setting(key)
-        for option in options:
-             if option['value'] == initial_setting:
-                 break
-             self._current_index += 1
+        # What gets shown right after saving.  That never changes.
+        self._saved_display = (self._title_left, "     Saved!     ")
 
-        # If we don't find it, just start at zero.
-        if self._current_index >= len(self._options):
-            self._current_index = 0
+    def on_push(self):
+        # Start on whatever the current selection is, NOT whatever the user
+        # was last looking at (and maybe didn't save) last time.  If we don't
+        # find it, just start at zero.
+        self._current_index = self._value_to_index.get(get_setting(self._key), 0)
 
     def _is_displaying_saved(self) -> bool:
         # If the current time is less than the time the user pressed save (plus
         # the timeout), then we're displaying saved.
-        return time.time() * 1000 < (self._save_time_millis + _SAVE_DISPLAY_MILLIS)
+        return self._save_time_ns is not None and time.monotonic_ns() < self._save_time_ns + _SAVE_DISPLAY_NS
 
     def handle_buttons(self, buttons: ButtonData) -> (_ReturnType, any):
         # Ignore any buttons if we're currently displaying the Saved! text.
@@ -153,30 +186,26 @@ class _SettingNode(_MenuNode):
             logger.debug(f'Setting {self._key} to {self._options[self._current_index]['value']}...')
             set_setting(self._key, self._options[self._current_index]['value'])
             # Remember when the user saved.  We'll display "Saved!" for a bit.
-            self._save_time_millis = time.time() * 1000
+            self._save_time_ns = time.monotonic_ns()
             return (_ReturnType.STAY_HERE, None)
         if buttons.minus:
-            self._current_index -= 1
-
-            if self._current_index < 0:
-                self._current_index = len(self._options) - 1
+            self._current_index = (self._current_index - 1) % len(self._options)
         if buttons.plus:
-            self._current_index += 1
-
-            if self._current_index >= len(self._options):
-                self._current_index = 0
+            self._current_index = (self._current_index + 1) % len(self._options)
 
         return (_ReturnType.STAY_HERE, None)
 
     def get_current_display(self) -> (str, str):
         # TODO: Maybe blink the selection?
         if self._is_displaying_saved():
-            return (self.title.ljust(16), "     Saved!     ")
+            return self._saved_display
 
-        return (self.title.ljust(16), self._options[self._current_index]['title'].rjust(16))
+        return self._get_list_display(self._options)
 
 class _TestNode(_MenuNode):
     """A node that shows a list of tests to be executed when selected."""
+    __slots__ = ('_tests', '_current_index')
+
     def __init__(self, title: str, tests: list):
         super().__init__(title)
         self._tests = tests
@@ -190,15 +219,9 @@ class _TestNode(_MenuNode):
             logger.debug(f'Starting test animation {self._tests[self._current_index]['title']}...')
             return (_ReturnType.GO_TO_VIEW, self._tests[self._current_index]['type'])
         if buttons.minus:
-            self._current_index -= 1
-
-            if self._current_index < 0:
-                self._current_index = len(self._tests) - 1
+            self._current_index = (self._current_index - 1) % len(self._tests)
         if buttons.plus:
-            self._current_index += 1
-
-            if self._current_index >= len(self._tests):
-                self._current_index = 0
+            self._current_index = (self._current_index + 1) % len(self._tests)
 
         return (_ReturnType.STAY_HERE, None)
 
@@ -206,43 +229,50 @@ class _TestNode(_MenuNode):
         # All we need is the title and test name.  A test will, by definition,
         # replace the display, and when it's done, we'll just be back at the
         # menu anyway.
-        return (self.title.ljust(16), self._tests[self._current_index]['title'].rjust(16))
+        return self._get_list_display(self._tests)
 
 class _TopLevel(_MenuNode):
     """The top of the menu.  It just displays the program name, the version, and
     a message to press MENU to continue."""
+    __slots__ = ()
+
     def handle_buttons(self, buttons: ButtonData) -> _ReturnType:
         if buttons.select:
-            return (_ReturnType.PUSH_MENU, _inflate_node(_NODE_STRUCTURE))
+            return (_ReturnType.PUSH_MENU, _MENU_TREE)
         if buttons.back:
             return (_ReturnType.POP_STACK, None)
         return (_ReturnType.STAY_HERE, None)
 
     def get_current_display(self) -> (str, str):
-        return (" dbpibus v0.7.6 ","   Press Menu   ")
+        return _TOP_LEVEL_DISPLAY
+
+_TOP_LEVEL_DISPLAY = (" dbpibus v0.7.6 ","   Press Menu   ")
+
+# How to make each type of node out of its dict.
+_NODE_CTORS = {
+    _NodeType.CONTAINER: lambda node: _ContainerNode(
+        title = node["title"],
+        children = node["children"]
+    ),
+    _NodeType.SETTING: lambda node: _SettingNode(
+        title = node["title"],
+        key = node["key"],
+        options = node["options"],
+        value_to_index = node["value_to_index"]
+    ),
+    _NodeType.TESTS: lambda node: _TestNode(
+        title = node["title"],
+        tests = node["tests"]
+    ),
+}
 
 def _inflate_node(node: dict) -> _MenuNode:
     """Inflates a node from a dict structure."""
-    match node["type"]:
-        case _NodeType.CONTAINER:
-            return _ContainerNode(
-                title = node["title"],
-                children = node["children"]
-            )
-        case _NodeType.SETTING:
-            return _SettingNode(
-                title = node["title"],
-                key = node["key"],
-                options = node["options"]
-            )
-        case _NodeType.TESTS:
-            return _TestNode(
-                title = node["title"],
-                tests = node["tests"]
-            )
-        case _:
-            logger.error(f'{node["type"]} is not a valid node type!')
-            return None
+    ctor = _NODE_CTORS.get(node["type"])
+    if ctor is None:
+        logger.error(f'{node["type"]} is not a valid node type!')
+        return None
+    return ctor(node)
 
 _NODE_STRUCTURE = {
     "type": _NodeType.CONTAINER,
@@ -404,12 +434,50 @@ _NODE_STRUCTURE = {
     ]
 }
 
+def _prepare_nodes(node: dict):
+    """Goes through the given node structure and works out everything about it
+    that never changes, so that doesn't have to happen every time someone
+    navigates around.  Every node, option, and test gets a 'title_right' entry
+    (its title, padded out the way it goes on the bottom line), and every
+    setting gets a 'value_to_index' entry (which option is which value)."""
+    node['title_right'] = node['title'].rjust(16)
+    if 'options' in node:
+        node['value_to_index'] = {option['value']: index for (index, option) in enumerate(node['options'])}
+    for key in ('children', 'options', 'tests'):
+        for child in node.get(key, ()):
+            _prepare_nodes(child)
+
+_prepare_nodes(_NODE_STRUCTURE)
+
+# The whole menu, all inflated and ready to go.  The nodes remember where they
+# were, so going back into a menu picks up where the user left off.
+_MENU_TREE = _inflate_node(_NODE_STRUCTURE)
+
+# What each test shows, as (function to make the view, what to pass it).  The
+# views all get priority -1, so they show up over the menu itself.
+_TEST_VIEW_TABLE = {
+    _TestView.SHIFT_DAWN_ANIM: (make_view_for_shift, Shift.DAWN_GUARD),
+    _TestView.SHIFT_ALPHA_ANIM: (make_view_for_shift, Shift.ALPHA_FLIGHT),
+    _TestView.SHIFT_NIGHT_ANIM: (make_view_for_shift, Shift.NIGHT_WATCH),
+    _TestView.SHIFT_ZETA_ANIM: (make_view_for_shift, Shift.ZETA_SHIFT),
+    _TestView.SHIFT_OMEGA_ANIM: (make_view_for_shift, Shift.OMEGA_SHIFT),
+    _TestView.EVENT_POINT_ANIM: (make_view_for_event, Event.POINT),
+    _TestView.EVENT_CRASH_ANIM: (make_view_for_event, Event.CRASH),
+    _TestView.EVENT_SPLAT_ANIM: (make_view_for_event, Event.SPLAT),
+    _TestView.EVENT_STOP_ANIM: (make_view_for_event, Event.STOP),
+}
+
 class ServiceMenuView(BaseView):
     """The entire service menu, as a view."""
     def __init__(self, lcd: characterlcd.Character_LCD):
         super().__init__(lcd)
         logger.info(f"Initializing ServiceMenuView!")
         self._menu_stack = [_TopLevel("Top Level")]
+        # The last display tuple we got from the stack and the message we made
+        # out of it.  The nodes hand back the same tuple until something
+        # changes, so this is usually just an identity check.
+        self._last_display = None
+        self._last_message = None
 
     @property
     def priority(self) -> int:
@@ -419,50 +487,45 @@ class ServiceMenuView(BaseView):
 
     def _get_test_view(self, test_view: _TestView) -> SimpleAnimationView:
         """Gets a view for a test."""
-        match test_view:
-            case _TestView.SHIFT_DAWN_ANIM:
-                return make_view_for_shift(self._lcd, Shift.DAWN_GUARD, -1)
-            case _TestView.SHIFT_ALPHA_ANIM:
-                return make_view_for_shift(self._lcd, Shift.ALPHA_FLIGHT, -1)
-            case _TestView.SHIFT_NIGHT_ANIM:
-                return make_view_for_shift(self._lcd, Shift.NIGHT_WATCH, -1)
-            case _TestView.SHIFT_ZETA_ANIM:
-                return make_view_for_shift(self._lcd, Shift.ZETA_SHIFT, -1)
-            case _TestView.SHIFT_OMEGA_ANIM:
-                return make_view_for_shift(self._lcd, Shift.OMEGA_SHIFT, -1)
-            case _TestView.EVENT_POINT_ANIM:
-                return make_view_for_event(self._lcd, Event.POINT, -1)
-            case _TestView.EVENT_SPLAT_ANIM:
-                return make_view_for_event(self._lcd, Event.SPLAT, -1)
-            case _TestView.EVENT_STOP_ANIM:
-                return make_view_for_event(self._lcd, Event.STOP, -1)
-            case _TestView.EVENT_CRASH_ANIM:
-                return make_view_for_event(self._lcd, Event.CRASH, -1)
+        entry = _TEST_VIEW_TABLE.get(test_view)
+        if entry is None:
+            return None
+        (make_view, what) = entry
+        return make_view(self._lcd, what, -1)
 
     def handle_buttons(self, data: any, buttons: ButtonData) -> any:
-        if len(self._menu_stack) == 0:
+        stack = self._menu_stack
+        if not stack:
             # Whoops.  The menu stack's empty.  Just forget it; next_frame will
             # close us out.
             return True
 
+        # Most frames, nobody's touching anything.  None of the nodes do
+        # anything when no buttons are down, so don't bother asking them.
+        if not (buttons.back or buttons.minus or buttons.plus or buttons.select):
+            self._previous_buttons = buttons
+            return True
+
         # If the last-known buttons are None, take whatever's pressed as the
         # first and ignore further processing.  That oughta stop us from
         # skipping right past _TopLevel at the start.
         if not self._previous_buttons is None and not self._previous_buttons == buttons:
-            (rtype, extra) = self._menu_stack[-1].handle_buttons(buttons)
+            top = stack[-1]
+            (rtype, extra) = top.handle_buttons(buttons)
 
             match rtype:
                 case _ReturnType.POP_STACK:
-                    logger.debug(f'Popping {self._menu_stack[-1]} from the stack...')
-                    self._menu_stack.pop()
+                    logger.debug(f'Popping {top} from the stack...')
+                    stack.pop()
 
                     # If the only thing left in the stack is TopLevel, remove it
                     # too.
-                    if len(self._menu_stack) == 1:
-                        self._menu_stack.pop()
+                    if len(stack) == 1:
+                        stack.pop()
                 case _ReturnType.PUSH_MENU:
                     logger.debug(f'Pushing {extra} onto the stack...')
-                    self._menu_stack.append(extra)
+                    extra.on_push()
+                    stack.append(extra)
                 case _ReturnType.GO_TO_VIEW:
                     logger.debug(f'Telling the main loop to show {extra}...')
                     # We have to update _previous_buttons here, as we're
@@ -474,12 +537,20 @@ class ServiceMenuView(BaseView):
         self._previous_buttons = buttons
         return True
 
-    def next_frame(self, data: any) -> bool:
-        if len(self._menu_stack) == 0:
+    def next_frame(self, data: any, now_millis: int=None) -> bool:
+        stack = self._menu_stack
+        if not stack:
             logger.debug('Stack is empty, exiting menu...')
             return True
 
-        (line1, line2) = self._menu_stack[-1].get_current_display()
-        self._display_text(line1, line2)
+        display = stack[-1].get_current_display()
+        if not display is self._last_display:
+            self._last_display = display
+            self._last_message = display[0] + "\n" + display[1]
+        # This still goes through _display_message every frame, which doesn't
+        # write anything if it's what's already on the screen.  If a test
+        # animation was on the screen in the meantime, though, this'll put the
+        # menu back.
+        self._display_message(self._last_message)
 
         return False
@@ -4,11 +4,15 @@
 
 from enum import Enum, auto
 from datetime import datetime
+from functools import lru_cache
 from zoneinfo import ZoneInfo
-from desertbus.simple_animation_view import SimpleAnimationView
+import time
+from desertbus.simple_animation_view import SimpleAnimationView, AnimationSequence
 
 PACIFIC_ZONEINFO = ZoneInfo('America/Vancouver')
 
+_SECS_PER_HOUR = 60 * 60
+
 class Shift(Enum):
     """Your garden-variety shift enums."""
     DAWN_GUARD = auto()
@@ -19,26 +23,39 @@ class Shift(Enum):
 
 # Color constants for the screen.  These don't perfectly align with the "canon"
 # colors used on-stream, as those don't really translate well to the LCD
-# display.
+# display.  These are (red, green, blue) tuples, since they're constants.
 SCREEN_COLORS = {
-    Shift.DAWN_GUARD: [80, 10, 0],
-    Shift.ALPHA_FLIGHT: [95, 0, 0],
-    Shift.NIGHT_WATCH: [20, 20, 90],
-    Shift.ZETA_SHIFT: [80, 0, 60],
-    Shift.OMEGA_SHIFT: [40, 40, 40],
+    Shift.DAWN_GUARD: (80, 10, 0),
+    Shift.ALPHA_FLIGHT: (95, 0, 0),
+    Shift.NIGHT_WATCH: (20, 20, 90),
+    Shift.ZETA_SHIFT: (80, 0, 60),
+    Shift.OMEGA_SHIFT: (40, 40, 40),
 }
 
-def get_current_shift() -> Shift:
+def get_current_shift(now_secs: float=None) -> Shift:
     """Gets the current shift based on the time out on the west coast.  It's
-    up to the caller to not call this if it's currently Omega Shift."""
-    right_now = datetime.now(PACIFIC_ZONEINFO)
-    if right_now.hour >=0 and right_now.hour < 6:
-        return Shift.ZETA_SHIFT
-    if right_now.hour >=6 and right_now.hour < 12:
-        return Shift.DAWN_GUARD
-    if right_now.hour >=12 and right_now.hour < 18:
-        return Shift.ALPHA_FLIGHT
-    return Shift.NIGHT_WATCH
+    up to the caller to not call this if it's currently Omega Shift.  now_secs
+    is the current (wall-clock, epoch) time in seconds, if the caller's already
+    got it handy; if not, this just asks the clock.
+
+    This gets called a LOT (every frame of the main loop), but the answer can
+    only ever change on the hour, so the actual work is cached per hour."""
+    if now_secs is None:
+        now_secs = time.time()
+    return _shift_for_hour(int(now_secs // _SECS_PER_HOUR))
+
+# Which shift each hour of the (Pacific) day is in.
+_SHIFT_BY_HOUR = ((Shift.ZETA_SHIFT,) * 6
+                  + (Shift.DAWN_GUARD,) * 6
+                  + (Shift.ALPHA_FLIGHT,) * 6
+                  + (Shift.NIGHT_WATCH,) * 6)
+
+@lru_cache(maxsize=2)
+def _shift_for_hour(hour_index: int) -> Shift:
+    """Works out the shift for the given hour (as in hours since the epoch).
+    Pacific time is always a whole number of hours off from UTC, DST or not, so
+    every shift boundary lands exactly on the start of one of these hours."""
+    return _SHIFT_BY_HOUR[datetime.fromtimestamp(hour_index * _SECS_PER_HOUR, PACIFIC_ZONEINFO).hour]
 
 # Shift animation sequences.
 DAWN_GUARD_ANIM = [
@@ -361,17 +378,27 @@ OMEGA_SHIFT_ANIM = [
     (5000,"  OMEGA  SHIFT  ","                "),
 ]
 
+# The above, all ready to play, same as the event animations.  No sense working
+# out the frame timings again every time the shift changes (or every time
+# someone tests one from the menu).
+DAWN_GUARD_SEQUENCE = AnimationSequence(DAWN_GUARD_ANIM)
+ALPHA_FLIGHT_SEQUENCE = AnimationSequence(ALPHA_FLIGHT_ANIM)
+NIGHT_WATCH_SEQUENCE = AnimationSequence(NIGHT_WATCH_ANIM)
+ZETA_SHIFT_SEQUENCE = AnimationSequence(ZETA_SHIFT_ANIM)
+OMEGA_SHIFT_SEQUENCE = AnimationSequence(OMEGA_SHIFT_ANIM)
+
+# The sequence and view name for each shift's transition.
+_SHIFT_VIEW_TABLE = {
+    Shift.DAWN_GUARD: (DAWN_GUARD_SEQUENCE, "Dawn Transition"),
+    Shift.ALPHA_FLIGHT: (ALPHA_FLIGHT_SEQUENCE, "Alpha Transition"),
+    Shift.NIGHT_WATCH: (NIGHT_WATCH_SEQUENCE, "Night Transition"),
+    Shift.ZETA_SHIFT: (ZETA_SHIFT_SEQUENCE, "Zeta Transition"),
+    Shift.OMEGA_SHIFT: (OMEGA_SHIFT_SEQUENCE, "Omega Transition"),
+}
+
 def make_view_for_shift(lcd, shift: Shift, priority: int = 5) -> SimpleAnimationView:
-    match(shift):
-        case Shift.DAWN_GUARD:
-            return SimpleAnimationView(lcd, DAWN_GUARD_ANIM, "Dawn Transition", priority)
-        case Shift.ALPHA_FLIGHT:
-            return SimpleAnimationView(lcd, ALPHA_FLIGHT_ANIM, "Alpha Transition", priority)
-        case Shift.NIGHT_WATCH:
-            return SimpleAnimationView(lcd, NIGHT_WATCH_ANIM, "Night Transition", priority)
-        case Shift.ZETA_SHIFT:
-            return SimpleAnimationView(lcd, ZETA_SHIFT_ANIM, "Zeta Transition", priority)
-        case Shift.OMEGA_SHIFT:
-            return SimpleAnimationView(lcd, OMEGA_SHIFT_ANIM, "Omega Transition", priority)
-        case _:
-            raise ValueError(f"Invalid value passed to make_view_for_shift(): {shift}")
+    entry = _SHIFT_VIEW_TABLE.get(shift)
+    if entry is None:
+        raise ValueError(f"Invalid value passed to make_view_for_shift(): {shift}")
+    (anim_sequence, name) = entry
+    return SimpleAnimationView(lcd, anim_sequence, name, priority)
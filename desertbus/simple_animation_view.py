@@ -1,112 +1,150 @@
 #!/usr/bin/env python3
 
-from desertbus.base_view import BaseView
+from desertbus.base_view import BaseView, monotonic_millis
 import logging
-import time
-from collections import deque
+from bisect import bisect_right
 import adafruit_character_lcd.character_lcd as characterlcd
 from desertbus.button_handler import ButtonData
 
 logger = logging.getLogger(__name__)
 
+# How wide the LCD is.  Every line of every frame has to be exactly this long;
+# the LCD doesn't clear between frames, so anything shorter leaves bits of the
+# last frame behind, and anything longer runs off the edge.
+_LINE_LENGTH = 16
+
+# Every distinct frame message any AnimationSequence has made so far.  The
+# animations repeat the same frames a LOT (blank lines, blinking text, and so
+# on), so this way they all share the one string for each, and comparing a frame
+# against what's already on screen is usually just an identity check.
+_message_pool = {}
+
+class AnimationSequence:
+    """An animation, all ready to play.  This takes a list of three-element
+    tuples in the form (duration_millis, line1, line2), where duration_millis is
+    the time (in millis) the frame should last, and line1 and line2 are the two
+    lines to be displayed, and works out once and for all when each frame starts
+    and what it puts on screen.  Nothing in here changes after that, so one of
+    these can be shared by as many views as want to play it, as many times as
+    they want to play it.
+
+    offsets[i] is when frame i starts, in millis from the start of the
+    animation, messages[i] is both of its lines joined up for the screen, and
+    end_millis is when the last frame is done (and thus the whole animation)."""
+    def __init__(self, anim_list: list):
+        offsets = []
+        messages = []
+        offset_millis = 0
+
+        for (time_millis, line1, line2) in anim_list:
+            if line1 is None or line2 is None:
+                raise ValueError("Animation lines can't be None!")
+            if not len(line1) == _LINE_LENGTH or not len(line2) == _LINE_LENGTH:
+                raise ValueError(f'Animation lines must be {_LINE_LENGTH} characters long! ({line1!r}, {line2!r})')
+            offsets.append(offset_millis)
+            message = line1 + "\n" + line2
+            messages.append(_message_pool.setdefault(message, message))
+            offset_millis = offset_millis + time_millis
+
+        self.offsets = offsets
+        self.messages = messages
+        self.end_millis = offset_millis
+
+# What an animation gets swapped out for if it's bailed out of early.  It's
+# over as soon as it starts.
+_EMPTY_SEQUENCE = AnimationSequence([])
+
 class SimpleAnimationView(BaseView):
     """A view that does a simple animation, then exits.
 
-    This depends heavily on the anim_sequence parameter.  That's a list of
-    three-element tuples in the form (duration_millis, line1, line2), where
-    duration_millis is the time (in millis) the frame should last, and line1 and
-    line2 are the two lines to be displayed."""
+    This depends heavily on the anim_sequence parameter.  That's either an
+    AnimationSequence or a list of three-element tuples in the form
+    (duration_millis, line1, line2), which gets made into an AnimationSequence
+    (see that for details).  If the same animation gets played over and over,
+    make the AnimationSequence once and pass that in every time."""
     def __init__(self,
                  lcd: characterlcd.Character_LCD,
-                 anim_sequence: list,
+                 anim_sequence: AnimationSequence | list,
                  name: str="Unnamed Animation",
                  priority: int=10):
         super().__init__(lcd)
         logger.info(f"Initializing SimpleAnimationView ({name})!")
         self._name = name
         self._priority = priority
+        if not isinstance(anim_sequence, AnimationSequence):
+            anim_sequence = AnimationSequence(anim_sequence)
         self._anim_sequence = anim_sequence
-        self._anim_deque = None
+        # When the animation started, in monotonic millis, or None if it hasn't
+        # started yet.  It starts on the first next_frame() call.
+        self._anim_start_millis = None
+        # The frame we were on last time.  Time only ever goes forward, so
+        # there's no need to search anything before it for the next one.
+        self._anim_index = 0
 
     @property
     def priority(self):
         return self._priority
-    
+
     @property
     def name(self):
         return f'SimpleAnimationView ({self._name})'
-    
-    def _prepare_animation(self, anim_list: list, start_time_millis=None) -> deque:
-        """Prepares a list of animation commands for execution.  This returns a
-        deque copy of the list where the first value in the tuple is each
-        real-world timestamp at which the animation should occur, assuming it
-        starts immediately, and should be fed into _do_animation_frame() to
-        execute the next frame as need be.  If you want to base it on some other
-        time, set start_time_millis accordingly."""
-        next_time_millis = start_time_millis
-        if next_time_millis is None:
-            next_time_millis = time.time() * 1000
-
-        result = deque()
 
-        for (time_millis, line1, line2) in anim_list:
-            if line1 is None or line2 is None:
-                raise ValueError("Animation lines can't be None!")
-            result.append((next_time_millis, line1, line2))
-            next_time_millis = next_time_millis + time_millis
-
-        # The last frame will have the time, but Nones for lines, to indicate it
-        # should wait for the last frame and then stop.
-        result.append((next_time_millis, None, None))
-
-        return result
-
-    def _do_animation_frame(self, anim_deque: deque) -> bool:
-        """Executes an animation frame.  Once a frame expires, it's removed from
-        the deque.  Once the deque is empty (or rather, once it runs into an
-        entry where the lines are Nones), this returns True.  Otherwise, this
-        returns False.  So, if this is a pure animation view (which most uses of
-        this will be), the result of _do_animation_frame() can generally be used
-        as the return value of next_frame().
-
-        Note that this DOES change anim_deque as it processes frames."""
-        if len(anim_deque) == 0:
-            # If the deque is empty already, we're likely bailing out of an in-
-            # progress animation.
-            logger.info('anim_deque is empty, bailing out of animation...')
+    def _start_animation(self, anim_sequence: AnimationSequence, start_time_millis=None):
+        """Starts (or restarts) the given animation.  It'll be run by
+        _do_animation_frame() as need be.  By default, it starts right now, but
+        if you want to base it on some other time, set start_time_millis
+        accordingly (in monotonic millis; see monotonic_millis())."""
+        self._anim_sequence = anim_sequence
+        self._anim_start_millis = start_time_millis if start_time_millis is not None else monotonic_millis()
+        self._anim_index = 0
+
+    def _do_animation_frame(self, now_millis: int=None) -> bool:
+        """Executes an animation frame of whatever _start_animation() last
+        started.  Once the animation has run its course, this returns True.
+        Otherwise, this returns False.  So, if this is a pure animation view
+        (which most uses of this will be), the result of _do_animation_frame()
+        can generally be used as the return value of next_frame().
+
+        The current frame is looked up by time every call, so if we miss a
+        bunch of frames (say, the network stalled us), we just skip right to the
+        one we should be on.
+
+        now_millis is the current time in monotonic millis, same as what gets
+        passed to next_frame().  If it's None, the current time is used."""
+        anim_sequence = self._anim_sequence
+        current_time_millis = now_millis if now_millis is not None else monotonic_millis()
+        elapsed_millis = current_time_millis - self._anim_start_millis
+
+        if elapsed_millis >= anim_sequence.end_millis or len(anim_sequence.messages) == 0:
+            # If we're past the end of the last frame (or the animation got
+            # cleared out), we're done with the animation.
             return True
 
-        current_time_millis = time.time() * 1000
-
-        # Step one, find the current frame.
-        current_frame = anim_deque[0]
-        while len(anim_deque) > 1 and anim_deque[1][0] < current_time_millis:
-            # If the NEXT frame is due, remove the lead from the queue and try
-            # again.
-            current_frame = anim_deque.popleft()
-
-        if len(anim_deque) == 0 or current_frame[1] is None or current_frame[2] is None:
-            # If the deque is empty at this point or we've reached the None/None
-            # sentinel value, we're done with the animation.
-            return True
+        # Find the current frame.  That's the last one that's started, which
+        # can't be any earlier than the one we were on last time.  If none have
+        # yet (i.e. this was started in the future), just stick with the first
+        # one.
+        last_index = self._anim_index
+        index = max(bisect_right(anim_sequence.offsets, elapsed_millis, last_index) - 1, last_index)
+        self._anim_index = index
 
         # Display the frame!
-        self._display_text(current_frame[1], current_frame[2])
+        self._display_message(anim_sequence.messages[index])
         return False
 
     def handle_buttons(self, data: any, buttons: ButtonData) -> any:
         if not self._previous_buttons is None:
             if buttons.select and not self._previous_buttons.select:
                 # If Menu/Select is pressed, bail out of the view right away.
-                logger.info('Select was pressed, clearing anim_deque...')
-                self._anim_deque.clear()
+                logger.info('Select was pressed, clearing animation...')
+                self._start_animation(_EMPTY_SEQUENCE)
 
         # In any case, we just eat the button.
         self._previous_buttons = buttons
         return None
 
-    def next_frame(self, data: any) -> bool:
-        if self._anim_deque is None:
-            self._anim_deque = self._prepare_animation(self._anim_sequence)
+    def next_frame(self, data: any, now_millis: int=None) -> bool:
+        if self._anim_start_millis is None:
+            self._start_animation(self._anim_sequence, now_millis)
 
-        return self._do_animation_frame(self._anim_deque)
+        return self._do_animation_frame(now_millis)
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+
+from bisect import insort
+from desertbus.base_view import BaseView
+
+class ViewQueue:
+    """The queue of views waiting for their turn on the display, kept sorted by
+    priority.  This used to be a heapq, but in practice there's hardly ever more
+    than two or three views in here at once (NormalView, plus maybe a transition
+    or event animation), so a plain sorted list does the job with less fuss.
+
+    Views of equal priority come out in the order they went in, which a heap
+    never promised."""
+    def __init__(self):
+        self._views = []
+        self._top = None
+
+    def __len__(self):
+        return len(self._views)
+
+    def push(self, view: BaseView):
+        """Adds a view to the queue, right behind anything else of the same
+        priority."""
+        insort(self._views, view)
+        self._top = self._views[0]
+
+    def push_all(self, views: list):
+        """Adds a whole batch of views to the queue at once.  This just does a
+        single sort afterward rather than one insert per view.  The sort is
+        stable, so the ordering rules are the same as push()."""
+        if views:
+            self._views.extend(views)
+            self._views.sort()
+            self._top = self._views[0]
+
+    @property
+    def top(self) -> BaseView:
+        """The highest-priority (lowest-numbered) view, or None if the queue is
+        empty.  This is kept up to date on every push and pop, so it's just a
+        lookup, not a trip into the list."""
+        return self._top
+
+    def pop(self) -> BaseView:
+        """Removes and returns the highest-priority view."""
+        view = self._views.pop(0)
+        self._top = self._views[0] if self._views else None
+        return view
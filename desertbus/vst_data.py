@@ -1,17 +1,27 @@
 #!/usr/bin/env python3
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from desertbus.shift_data import Shift
 import time
 
 _SERVICE_DOT_MILLIS = 120000
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class VstData:
-    """The various data useful for display.  NOT just the raw API JSON blob. """
+    """The various data useful for display.  NOT just the raw API JSON blob.
 
-    # The time (millis since the epoch) this data was fetched.
-    time_fetched: int = 0
+    One of these gets made every fetch and read every frame, so it's slotted;
+    that makes it smaller and quicker to read from than a plain dataclass."""
+
+    # The time (millis since the epoch) this data was fetched.  This (and the
+    # one below it) are left out of comparisons; two fetches that came back
+    # with the same stats are the same data as far as anything displaying it is
+    # concerned, and that way, NormalView doesn't redo everything for them.
+    time_fetched: int = field(default=0, compare=False)
+    # The same, but in monotonic millis (see time.monotonic_ns()).  This is
+    # what the service dot goes by, so it doesn't come on (or go off) just
+    # because NTP nudged the wall clock.
+    time_fetched_monotonic: int = field(default=0, compare=False)
 
     # The current donation total.
     donation_total: float = 0.0
@@ -49,11 +59,24 @@ class VstData:
     is_live: bool = False
     # True if Omega Shift is live, False if not, None if there was an error
     # fetching it (likely meaning we just retain the previous value).
-    is_omega_shift: bool = False
+    is_omega_shift: bool | None = False
     # True if the bus is en route to Tucson, False if the bus is en route to
     # Las Vegas.
     is_going_to_tucson: bool = False
 
-def needs_service_dot(data: VstData) -> bool:
-    time_since_last = (time.time() * 1000) - data.time_fetched
-    return time_since_last > _SERVICE_DOT_MILLIS
+    # When (in monotonic millis) this data gets old enough to need the service
+    # dot.  This is worked out from time_fetched_monotonic, not passed in.
+    service_dot_deadline: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # It's frozen, so this has to go around the usual setattr.  This way,
+        # the add happens once per fetch instead of a subtract every frame.
+        object.__setattr__(self, 'service_dot_deadline', self.time_fetched_monotonic + _SERVICE_DOT_MILLIS)
+
+def needs_service_dot(data: VstData, now_millis: int=None) -> bool:
+    """Whether or not the data's gotten old enough that we should put the
+    service dot up.  now_millis is the current time in monotonic millis, if the
+    caller's already got it; if not, this just asks the clock."""
+    if now_millis is None:
+        now_millis = time.monotonic_ns() // 1_000_000
+    return now_millis > data.service_dot_deadline